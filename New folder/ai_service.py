@@ -18,7 +18,8 @@ class AIService:
         Generate a response using OpenAI's chat API
         """
         try:
-            messages = context if context else []
+            # Copy so the caller's context list is not mutated
+            messages = list(context) if context else []
             messages.append({"role": "user", "content": prompt})
 
             response = openai.ChatCompletion.create(
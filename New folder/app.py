@@ -1,4 +1,5 @@
 import os
+import sys
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
@@ -14,6 +15,13 @@ if not api_key:
 else:
     print("🔑 OpenAI Key Loaded Successfully")
 
+# Share one event loop and HTTP session across requests when AI_ASYNC=true
+USE_ASYNC_AI = os.getenv("AI_ASYNC", "false").lower() == "true"
+if USE_ASYNC_AI:
+    # The async service is the main app's; its modules import each other from app/
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+    from services.async_ai_service import AsyncAIService
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
@@ -38,7 +46,13 @@ def chat():
             return jsonify({"status": "error", "response": "No message provided"}), 400
 
         # Call AIService to get response
-        response = AIService.generate_chat_response(user_message, chat_context)
+        if USE_ASYNC_AI:
+            ai = AsyncAIService.instance()
+            response = ai.run(ai.generate_chat_response(user_message, chat_context))
+            if response["status"] != "success":
+                response["response"] = "AI Service error: " + response["error"]
+        else:
+            response = AIService.generate_chat_response(user_message, chat_context)
 
         print("🛠 AI Response:", response)  # Debugging log
 
@@ -6,8 +6,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from models import db, User
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
 import json
 import os
+import random
 
 app = Flask(__name__)
 
@@ -19,6 +23,46 @@ login_manager.login_view = "auth.login"  # Redirect unauthorized users
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
+
+class JitteredRetry(Retry):
+    """Retry policy using exponential backoff with full random jitter."""
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+def create_ai_session(config):
+    """
+    Create a pooled keep-alive HTTP session for the AI endpoint.
+    Retries 429/5xx responses with jittered exponential backoff, honouring Retry-After.
+    """
+    retry = JitteredRetry(
+        total=config['AI_MAX_RETRIES'],
+        connect=config['AI_MAX_RETRIES'],
+        read=0,  # A read timeout may mean the model already ran; don't pay twice
+        status=config['AI_MAX_RETRIES'],
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['POST']),
+        backoff_factor=config['AI_BACKOFF_FACTOR'],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config['AI_POOL_CONNECTIONS'],
+        pool_maxsize=config['AI_POOL_MAXSIZE'],
+        pool_block=True,  # Bursts wait for a free connection instead of opening new sockets
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {config["AI_API_KEY"]}',
+        'Connection': 'keep-alive'
+    })
+    return session
+
 def create_app():
     app = Flask(__name__)
     
@@ -39,24 +83,32 @@ def create_app():
         app.config['AI_API_KEY'] = os.getenv('AI_API_KEY')
         app.config['AI_ENDPOINT'] = os.getenv('AI_ENDPOINT', 'https://api.openai.com/v1/chat/completions')
     
+    # HTTP connection pool settings for the AI endpoint
+    app.config['AI_POOL_CONNECTIONS'] = int(os.getenv('AI_POOL_CONNECTIONS', 10))
+    app.config['AI_POOL_MAXSIZE'] = int(os.getenv('AI_POOL_MAXSIZE', 20))
+    app.config['AI_CONNECT_TIMEOUT'] = float(os.getenv('AI_CONNECT_TIMEOUT', 5))
+    app.config['AI_READ_TIMEOUT'] = float(os.getenv('AI_READ_TIMEOUT', 60))
+    app.config['AI_MAX_RETRIES'] = int(os.getenv('AI_MAX_RETRIES', 3))
+    app.config['AI_BACKOFF_FACTOR'] = float(os.getenv('AI_BACKOFF_FACTOR', 0.5))
+    
+    app.ai_session = create_ai_session(app.config)
+    atexit.register(app.ai_session.close)
     
     # AI response function
     def get_ai_response(prompt):
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {app.config["AI_API_KEY"]}'
-        }
-        
         data = {
             'model': 'gpt-3.5-turbo',
             'messages': [{'role': 'user', 'content': prompt}]
         }
         
-        response = requests.post(
-            app.config['AI_ENDPOINT'],
-            headers=headers,
-            data=json.dumps(data)
-        )
+        try:
+            response = app.ai_session.post(
+                app.config['AI_ENDPOINT'],
+                data=json.dumps(data),
+                timeout=(app.config['AI_CONNECT_TIMEOUT'], app.config['AI_READ_TIMEOUT'])
+            )
+        except requests.RequestException as e:
+            return f"Error: {e}"
         
         if response.status_code == 200:
             return response.json()['choices'][0]['message']['content']
@@ -73,6 +125,24 @@ def create_app():
     except ImportError as e:
         print(f"Warning: Could not import assessment blueprint: {e}")
     
+    try:
+        from routes.analytics_export import analytics_export_bp
+        app.register_blueprint(analytics_export_bp)
+    except ImportError as e:
+        print(f"Warning: Could not import analytics export blueprint: {e}")
+    
+    try:
+        from routes.analytics_charts import analytics_charts_bp
+        app.register_blueprint(analytics_charts_bp)
+    except ImportError as e:
+        print(f"Warning: Could not import analytics charts blueprint: {e}")
+    
+    try:
+        from routes.student_import import student_import_bp
+        app.register_blueprint(student_import_bp)
+    except ImportError as e:
+        print(f"Warning: Could not import student import blueprint: {e}")
+    
     # Sample AI route (you can move this to a blueprint later)
     @app.route('/ai/ask/<question>')
     def ask_ai(question):
@@ -10,9 +10,18 @@ class Student(db.Model):
     date_of_birth = db.Column(db.Date, nullable=True)
     grade_level = db.Column(db.Integer, nullable=True)
     profile_image = db.Column(db.String(200), nullable=True, default='default.jpg')
+    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination: listings are walked in (id) or (created_at, id) order,
+    # optionally filtered by grade or teacher
+    __table_args__ = (
+        db.Index('ix_student_grade_level_id', 'grade_level', 'id'),
+        db.Index('ix_student_teacher_id_id', 'teacher_id', 'id'),
+        db.Index('ix_student_created_at_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     assessments = db.relationship('Assessment', backref='student', lazy=True)
     
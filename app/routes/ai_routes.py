@@ -1,39 +1,353 @@
 # routes/ai_routes.py
-from flask import Blueprint, request, jsonify
-from services.ai_service import AIService
+import json
+import os
+from functools import wraps
+from flask import Blueprint, request, jsonify, Response, stream_with_context, url_for, current_app
+from services.ai_service import (
+    AIService, CHAT_MAX_TOKENS, CONTENT_MAX_TOKENS,
+    get_conversation_store, get_job_queue, get_rate_limiter, parse_batch_item
+)
+from services.conversation_store import estimate_tokens
+from services.rate_limiter import retry_after_header
 
 ai_bp = Blueprint('ai', __name__)
 
+# Route AI calls through the shared event loop of AsyncAIService when enabled
+USE_ASYNC_AI = os.getenv('AI_ASYNC', 'false').lower() == 'true'
+
+MAX_BATCH_ITEMS = int(os.getenv('AI_MAX_BATCH_ITEMS', '100'))
+
+RATE_LIMIT_ENABLED = os.getenv('AI_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+
+def rate_limit_identity():
+    """Identify the caller: the logged-in teacher, else the client address."""
+    if hasattr(current_app, 'login_manager'):
+        from flask_login import current_user
+        if current_user.is_authenticated:
+            return f"user:{current_user.get_id()}"
+    return f"ip:{request.remote_addr}"
+
+def estimate_request_tokens(data):
+    """Estimate the prompt tokens a request body will send upstream."""
+    texts = [data.get('prompt') or '']
+    for message in data.get('context') or []:
+        if isinstance(message, dict):
+            texts.append(message.get('content') or '')
+    for item in data.get('items') or []:
+        if isinstance(item, str):
+            texts.append(item)
+        elif isinstance(item, dict):
+            texts.append(item.get('prompt') or '')
+        elif isinstance(item, (list, tuple)) and item:
+            texts.append(str(item[0]))
+    return sum(estimate_tokens(str(text)) for text in texts)
+
+def prompt_error(data):
+    """Why a prompt request body is invalid, or None."""
+    if 'prompt' not in data:
+        return "Prompt is required"
+    return None
+
+def batch_error(data):
+    """Why a batch request body is invalid, or None."""
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return "A non-empty list of items is required"
+    if len(items) > MAX_BATCH_ITEMS:
+        return f"A batch may contain at most {MAX_BATCH_ITEMS} items"
+    for index, item in enumerate(items):
+        try:
+            parse_batch_item(item)
+        except ValueError as e:
+            return f"Item {index}: {e}"
+    return None
+
+def job_error(data):
+    """Why a job request body is invalid, or None."""
+    if 'prompt' not in data:
+        return "Prompt is required"
+    if data.get('type', 'generate') not in ('generate', 'chat'):
+        return "type must be 'generate' or 'chat'"
+    return None
+
+def rate_limited(endpoint, completion_tokens, validate=prompt_error):
+    """
+    Enforce the per-user request rate and daily token budget before the view
+    runs. Requests are charged their prompt size plus the maximum completion
+    length for each item they generate, and take one bucket slot per item.
+    Bodies that `validate` rejects are passed to the view uncharged, for it
+    to answer with a 400.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return view(*args, **kwargs)
+
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or validate(data):
+                return view(*args, **kwargs)
+
+            items = data.get('items') if isinstance(data.get('items'), list) else None
+            generations = len(items) if items else 1
+            tokens = estimate_request_tokens(data) + completion_tokens * generations
+
+            allowed, retry_after, reason = get_rate_limiter().acquire(
+                rate_limit_identity(), endpoint, tokens, cost=generations
+            )
+            if not allowed:
+                if retry_after is None:
+                    # Waiting won't help; the request itself is too large
+                    return jsonify({"error": reason}), 413
+                return jsonify({"error": reason}), 429, {'Retry-After': retry_after_header(retry_after)}
+
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_async_service():
+    from services.async_ai_service import AsyncAIService
+    return AsyncAIService.instance()
+
+def sse_event(data, event=None):
+    """Format a single Server-Sent Events message."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+def sse_response(deltas):
+    """Wrap a generator of text deltas in a text/event-stream response."""
+    def events():
+        try:
+            for text in deltas:
+                yield sse_event({"delta": text})
+            yield sse_event({}, event='done')
+        except Exception as e:
+            yield sse_event({"error": str(e)}, event='error')
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Keep reverse proxies from buffering the stream
+        }
+    )
+
+def load_chat_context(data):
+    """
+    Return the context for a chat request: the stored history when a
+    conversation_id is given, otherwise the client-supplied context.
+    Returns None as the first item if the conversation doesn't exist.
+    """
+    conversation_id = data.get('conversation_id')
+    if conversation_id:
+        return get_conversation_store().get_messages(conversation_id), conversation_id
+    return data.get('context', None) or [], None
+
+def record_stream(deltas, conversation_id, prompt):
+    """Pass deltas through and store the exchange once the reply is complete."""
+    parts = []
+    for text in deltas:
+        parts.append(text)
+        yield text
+    get_conversation_store().append(
+        conversation_id,
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": "".join(parts)}
+    )
+
 @ai_bp.route('/chat', methods=['POST'])
+@rate_limited('chat', CHAT_MAX_TOKENS)
 def chat():
     data = request.get_json()
-    
+
     if not data or 'prompt' not in data:
         return jsonify({"error": "Prompt is required"}), 400
-    
+
     prompt = data['prompt']
-    context = data.get('context', None)
-    
-    response = AIService.generate_chat_response(prompt, context)
-    
+    context, conversation_id = load_chat_context(data)
+    if context is None:
+        return jsonify({"error": "Conversation not found"}), 404
+
+    if USE_ASYNC_AI:
+        ai = get_async_service()
+        response = ai.run(ai.generate_chat_response(prompt, context))
+    else:
+        response = AIService.generate_chat_response(prompt, context)
+
     if response['status'] == 'error':
         return jsonify({"error": response['error']}), 500
-    
+
+    if conversation_id:
+        get_conversation_store().append(
+            conversation_id,
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": response['response']}
+        )
+        return jsonify({"response": response['response'], "conversation_id": conversation_id})
+
     return jsonify({"response": response['response']})
 
+@ai_bp.route('/chat/stream', methods=['POST'])
+@rate_limited('chat', CHAT_MAX_TOKENS)
+def chat_stream():
+    data = request.get_json()
+
+    if not data or 'prompt' not in data:
+        return jsonify({"error": "Prompt is required"}), 400
+
+    prompt = data['prompt']
+    context, conversation_id = load_chat_context(data)
+    if context is None:
+        return jsonify({"error": "Conversation not found"}), 404
+
+    if USE_ASYNC_AI:
+        ai = get_async_service()
+        deltas = ai.iter_stream(ai.stream_chat_response(prompt, context))
+    else:
+        deltas = AIService.stream_chat_response(prompt, context)
+
+    if conversation_id:
+        deltas = record_stream(deltas, conversation_id, prompt)
+
+    return sse_response(deltas)
+
+@ai_bp.route('/conversations', methods=['POST'])
+def create_conversation():
+    conversation_id = get_conversation_store().create()
+    return jsonify({"conversation_id": conversation_id}), 201
+
+@ai_bp.route('/conversations/<conversation_id>', methods=['GET'])
+def get_conversation(conversation_id):
+    messages = get_conversation_store().get_messages(conversation_id)
+    if messages is None:
+        return jsonify({"error": "Conversation not found"}), 404
+    return jsonify({"conversation_id": conversation_id, "messages": messages})
+
+@ai_bp.route('/conversations/<conversation_id>', methods=['DELETE'])
+def delete_conversation(conversation_id):
+    get_conversation_store().delete(conversation_id)
+    return jsonify({"message": "Conversation deleted successfully"})
+
 @ai_bp.route('/generate', methods=['POST'])
+@rate_limited('generate', CONTENT_MAX_TOKENS)
 def generate_content():
     data = request.get_json()
-    
+
     if not data or 'prompt' not in data:
         return jsonify({"error": "Prompt is required"}), 400
-    
+
     prompt = data['prompt']
     content_type = data.get('content_type', 'text')
-    
-    response = AIService.generate_content(prompt, content_type)
-    
+
+    if USE_ASYNC_AI:
+        ai = get_async_service()
+        response = ai.run(ai.generate_content(prompt, content_type))
+    else:
+        response = AIService.generate_content(prompt, content_type)
+
     if response['status'] == 'error':
         return jsonify({"error": response['error']}), 500
-    
-    return jsonify({"content": response['content']})
\ No newline at end of file
+
+    return jsonify({"content": response['content']})
+
+@ai_bp.route('/generate/batch', methods=['POST'])
+@rate_limited('generate_batch', CONTENT_MAX_TOKENS, validate=batch_error)
+def generate_content_batch():
+    data = request.get_json()
+
+    # Reject malformed items now; once the stream starts only per-item errors can be reported
+    error = batch_error(data) if isinstance(data, dict) else "A non-empty list of items is required"
+    if error:
+        return jsonify({"error": error}), 400
+
+    def results():
+        # One JSON object per line, in completion order
+        for result in AIService.generate_content_batch(data['items']):
+            yield json.dumps(result) + "\n"
+
+    return Response(
+        stream_with_context(results()),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no'}
+    )
+
+@ai_bp.route('/generate/stream', methods=['POST'])
+@rate_limited('generate', CONTENT_MAX_TOKENS)
+def generate_content_stream():
+    data = request.get_json()
+
+    if not data or 'prompt' not in data:
+        return jsonify({"error": "Prompt is required"}), 400
+
+    prompt = data['prompt']
+    content_type = data.get('content_type', 'text')
+
+    if USE_ASYNC_AI:
+        ai = get_async_service()
+        deltas = ai.iter_stream(ai.stream_content(prompt, content_type))
+    else:
+        deltas = AIService.stream_content(prompt, content_type)
+
+    return sse_response(deltas)
+
+@ai_bp.route('/jobs', methods=['POST'])
+@rate_limited('jobs', CONTENT_MAX_TOKENS, validate=job_error)
+def submit_job():
+    data = request.get_json()
+
+    error = job_error(data) if isinstance(data, dict) else "Prompt is required"
+    if error:
+        return jsonify({"error": error}), 400
+
+    job_type = data.get('type', 'generate')
+    if job_type == 'generate':
+        payload = {"prompt": data['prompt'], "content_type": data.get('content_type', 'text')}
+    else:
+        payload = {"prompt": data['prompt'], "context": data.get('context', None)}
+
+    job_id = get_job_queue().submit(job_type, payload)
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for('ai.job_status', job_id=job_id),
+        "result_url": url_for('ai.job_result', job_id=job_id)
+    }), 202
+
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    job.pop('result')
+    return jsonify(job)
+
+@ai_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    if job['status'] == 'failed':
+        return jsonify({"status": job['status'], "error": job['error']}), 500
+    if job['status'] != 'succeeded':
+        # Not finished yet; tell the client when to poll again
+        return jsonify({"status": job['status']}), 202, {'Retry-After': '2'}
+
+    return jsonify({"status": job['status'], "result": job['result']})
+
+@ai_bp.route('/usage', methods=['GET'])
+def usage():
+    return jsonify(get_rate_limiter().usage(rate_limit_identity()))
+
+@ai_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(AIService.cache_stats())
+
+@ai_bp.route('/coalescing/stats', methods=['GET'])
+def coalescing_stats():
+    stats = {"sync": AIService.coalescing_stats()}
+    if USE_ASYNC_AI:
+        stats["async"] = get_async_service().flight.stats()
+    return jsonify(stats)
@@ -0,0 +1,115 @@
+# routes/analytics_charts.py
+import threading
+from flask import Blueprint, request, jsonify, current_app
+from routes.analytics_export import open_tracker, tracker_exists, tracker_path
+from routes.analytics_routes import PerformanceTracker
+from services.chart_service import ChartService, MIMETYPES, dashboard_chart_key, metric_chart_key
+
+analytics_charts_bp = Blueprint('analytics_charts', __name__)
+
+_chart_service = None
+_chart_service_lock = threading.Lock()
+
+def get_chart_service() -> ChartService:
+    """Return the shared chart renderer and its cache, creating it on first use."""
+    global _chart_service
+    with _chart_service_lock:
+        if _chart_service is None:
+            _chart_service = ChartService.from_env()
+        return _chart_service
+
+def parse_days(value, default=None):
+    """Parse a last_n_days query argument; raises ValueError unless it is a positive integer."""
+    if value is None or value == '':
+        return default
+    days = int(value)
+    if days < 1:
+        raise ValueError
+    return days
+
+def chart_response(image, key, fmt):
+    """
+    Serve rendered chart bytes. The cache key names the data and options the
+    chart was drawn from, so it is the ETag; clients revalidate on every use
+    because the tracker may record new data at any time.
+    """
+    response = current_app.response_class(image, mimetype=MIMETYPES[fmt])
+    response.set_etag(key)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def cached_chart(key, fmt):
+    """
+    Answer from the client's copy or the chart cache without loading the
+    tracker, or return None if the chart has to be rendered
+    """
+    if request.if_none_match.contains(key):
+        return chart_response(b'', key, fmt)
+    image = get_chart_service().cached(key)
+    if image is None:
+        return None
+    return chart_response(image, key, fmt)
+
+@analytics_charts_bp.route('/analytics/trackers/<name>/charts/<metric>.<fmt>', methods=['GET'])
+def metric_chart(name, metric, fmt):
+    if fmt not in MIMETYPES:
+        return jsonify({"error": "format must be 'png' or 'svg'"}), 404
+    if not tracker_exists(name):
+        return jsonify({"error": f"Tracker not found: {name}"}), 404
+    try:
+        last_n_days = parse_days(request.args.get('last_n_days'))
+    except ValueError:
+        return jsonify({"error": "last_n_days must be a positive integer"}), 400
+    show_goal = request.args.get('show_goal', 'true').lower() != 'false'
+
+    # The saved version is read without loading the data, so unchanged charts skip the load
+    path = tracker_path(name)
+    key = metric_chart_key(name, PerformanceTracker.saved_version(path), metric, show_goal, last_n_days, fmt)
+    response = cached_chart(key, fmt)
+    if response is not None:
+        return response
+
+    tracker = open_tracker(path)
+    if metric not in tracker.metrics:
+        return jsonify({"error": f"Metric not found: {metric}"}), 404
+
+    try:
+        image, key = get_chart_service().render_metric(
+            tracker, metric, show_goal=show_goal, last_n_days=last_n_days, fmt=fmt, name=name
+        )
+    except ValueError as e:
+        # No data for the metric in the requested window
+        return jsonify({"error": str(e)}), 404
+    return chart_response(image, key, fmt)
+
+@analytics_charts_bp.route('/analytics/trackers/<name>/dashboard.<fmt>', methods=['GET'])
+def dashboard_chart(name, fmt):
+    if fmt not in MIMETYPES:
+        return jsonify({"error": "format must be 'png' or 'svg'"}), 404
+    if not tracker_exists(name):
+        return jsonify({"error": f"Tracker not found: {name}"}), 404
+    try:
+        last_n_days = parse_days(request.args.get('last_n_days'), 30)
+    except ValueError:
+        return jsonify({"error": "last_n_days must be a positive integer"}), 400
+    metrics = [m for m in request.args.get('metrics', '').split(',') if m] or None
+
+    path = tracker_path(name)
+    key = dashboard_chart_key(name, PerformanceTracker.saved_version(path), metrics, last_n_days, fmt)
+    response = cached_chart(key, fmt)
+    if response is not None:
+        return response
+
+    tracker = open_tracker(path)
+    try:
+        image, key = get_chart_service().render_dashboard(
+            tracker, metrics, last_n_days=last_n_days, fmt=fmt, name=name
+        )
+    except ValueError as e:
+        # None of the requested metrics exist, or the tracker has none
+        return jsonify({"error": str(e)}), 404
+    return chart_response(image, key, fmt)
+
+@analytics_charts_bp.route('/analytics/charts/stats', methods=['GET'])
+def chart_stats():
+    return jsonify(get_chart_service().stats())
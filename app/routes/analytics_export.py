@@ -0,0 +1,234 @@
+# routes/analytics_export.py
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, List, Union
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import pandas as pd
+from routes.analytics_routes import PerformanceTracker
+
+analytics_export_bp = Blueprint('analytics_export', __name__)
+
+# Rows per worksheet in the .xlsx format
+EXCEL_MAX_ROWS = 1048576
+
+# Bytes read at a time when streaming a finished workbook
+STREAM_CHUNK_SIZE = 64 * 1024
+
+TrackerSource = Union[PerformanceTracker, str]
+
+def tracker_path(name: str) -> str:
+    """Directory where save_data and the journal keep a tracker's columnar snapshot."""
+    slug = name.lower().replace(' ', '_')
+    return os.path.join(f"performance_data_{slug}", slug)
+
+def tracker_exists(name: str) -> bool:
+    # Names come from URLs; they must not reach outside the tracker's directory
+    if not name or '/' in name or '\\' in name or name.startswith('.'):
+        return False
+    return os.path.exists(os.path.join(tracker_path(name), 'meta.json'))
+
+def open_tracker(source: TrackerSource) -> PerformanceTracker:
+    """Resolve a tracker instance, a snapshot directory or a tracker name to a (memory-mapped) tracker."""
+    if isinstance(source, PerformanceTracker):
+        return source
+    if os.path.isdir(source):
+        return PerformanceTracker.load_data(source)
+    return PerformanceTracker.load_data(tracker_path(source))
+
+def cohort_metrics(cohorts: Dict[str, List[TrackerSource]]) -> List[str]:
+    """
+    Union of the metrics of every tracker, in first-seen order. Trackers are
+    opened one at a time and released, so only one is in memory at once.
+    """
+    metrics = {}
+    for sources in cohorts.values():
+        for source in sources:
+            for metric in open_tracker(source).metrics:
+                metrics.setdefault(metric, None)
+    return list(metrics)
+
+def iter_cohort_csv(cohorts: Dict[str, Iterable[TrackerSource]], chunk_rows: int = 10000) -> Iterable[str]:
+    """
+    Yield one CSV of every cohort's data with cohort, student and date columns
+    followed by the union of all metrics. Each tracker is loaded only while its
+    rows are written, one block of rows at a time.
+    """
+    cohorts = {cohort: list(sources) for cohort, sources in cohorts.items()}
+    columns = ['date'] + cohort_metrics(cohorts)
+
+    yield pd.DataFrame(columns=['cohort', 'student'] + columns).to_csv(index=False)
+    for cohort, sources in cohorts.items():
+        for source in sources:
+            tracker = open_tracker(source)
+            for block in tracker.iter_blocks(chunk_rows):
+                block = block.reindex(columns=columns)
+                block.insert(0, 'student', tracker.name)
+                block.insert(0, 'cohort', cohort)
+                yield block.to_csv(index=False, header=False)
+
+def export_cohorts_csv(cohorts: Dict[str, Iterable[TrackerSource]], dirpath: str,
+                       chunk_rows: int = 10000) -> List[str]:
+    """
+    Write one CSV file per cohort into a directory.
+
+    Returns:
+        Paths of the written files
+    """
+    os.makedirs(dirpath, exist_ok=True)
+    paths = []
+    for cohort, sources in cohorts.items():
+        filepath = os.path.join(dirpath, f"{cohort.lower().replace(' ', '_')}.csv")
+        with open(filepath, 'w', newline='') as f:
+            for chunk in iter_cohort_csv({cohort: sources}, chunk_rows):
+                f.write(chunk)
+        paths.append(filepath)
+    return paths
+
+def _sheet_name(name: str, used: set) -> str:
+    """Make a valid, unused worksheet name (at most 31 characters, no []:*?/\\)."""
+    base = re.sub(r'[\[\]:*?/\\]', '_', name)[:31] or 'Sheet'
+    candidate, n = base, 2
+    while candidate.lower() in used:
+        suffix = f" ({n})"
+        candidate, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(candidate.lower())
+    return candidate
+
+def export_cohorts_excel(cohorts: Dict[str, Iterable[TrackerSource]], filepath: str,
+                         chunk_rows: int = 10000) -> str:
+    """
+    Write a workbook with one sheet per cohort: student and date columns
+    followed by the union of all metrics. The workbook is in constant_memory
+    mode and trackers are loaded one at a time, so memory use does not grow
+    with the number of students. A cohort that outgrows a sheet continues on
+    another one.
+    """
+    import xlsxwriter
+
+    cohorts = {cohort: list(sources) for cohort, sources in cohorts.items()}
+    metrics = cohort_metrics(cohorts)
+
+    workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True})
+    header = workbook.add_format({'bold': True, 'border': 1})
+    used = set()
+
+    def new_sheet(cohort):
+        sheet = workbook.add_worksheet(_sheet_name(cohort, used))
+        sheet.write_row(0, 0, ['student', 'date'] + metrics, header)
+        return sheet
+
+    try:
+        for cohort, sources in cohorts.items():
+            sheet, row = new_sheet(cohort), 1
+            for source in sources:
+                tracker = open_tracker(source)
+                if row + len(tracker) > EXCEL_MAX_ROWS:
+                    sheet, row = new_sheet(cohort), 1
+                row = tracker.write_rows(sheet, row, metrics, prefix=(tracker.name,), chunk_rows=chunk_rows)
+    finally:
+        workbook.close()
+
+    return filepath
+
+def _attachment(filename: str) -> Dict[str, str]:
+    return {'Content-Disposition': f'attachment; filename="{filename}"'}
+
+def _remove_quietly(filepath: str) -> None:
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
+
+def _stream_file(filepath: str) -> Iterable[bytes]:
+    """Stream a temporary file in chunks and delete it once it has been read or the stream is closed."""
+    try:
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        _remove_quietly(filepath)
+
+def _temp_path(suffix: str) -> str:
+    fd, filepath = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    return filepath
+
+def _excel_response(export, filename: str) -> Response:
+    """
+    Write a workbook with export(path) to a temporary file and stream it.
+    The file is deleted if the export fails, and otherwise when the response
+    is closed, which also happens when the client disconnects before the
+    body is read.
+    """
+    # xlsx is a zip archive, so it is finished on disk and then streamed out
+    filepath = _temp_path('.xlsx')
+    try:
+        export(filepath)
+    except Exception:
+        _remove_quietly(filepath)
+        raise
+
+    response = Response(
+        _stream_file(filepath),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        headers=_attachment(filename)
+    )
+    response.call_on_close(lambda: _remove_quietly(filepath))
+    return response
+
+@analytics_export_bp.route('/analytics/trackers/<name>/export.csv', methods=['GET'])
+def export_tracker_csv(name):
+    if not tracker_exists(name):
+        return jsonify({"error": f"Tracker not found: {name}"}), 404
+
+    tracker = open_tracker(tracker_path(name))
+    return Response(
+        stream_with_context(tracker.iter_csv()),
+        mimetype='text/csv',
+        headers=_attachment(f"{name.lower().replace(' ', '_')}.csv")
+    )
+
+@analytics_export_bp.route('/analytics/trackers/<name>/export.xlsx', methods=['GET'])
+def export_tracker_excel(name):
+    if not tracker_exists(name):
+        return jsonify({"error": f"Tracker not found: {name}"}), 404
+
+    return _excel_response(
+        lambda filepath: open_tracker(tracker_path(name)).export_to_excel(filepath),
+        f"{name.lower().replace(' ', '_')}.xlsx"
+    )
+
+@analytics_export_bp.route('/analytics/export', methods=['POST'])
+def export_cohorts():
+    """
+    Export many trackers grouped by cohort.
+    Body: {"cohorts": {"<cohort>": ["<tracker name>", ...]}, "format": "csv" | "xlsx"}
+    """
+    data = request.get_json(silent=True) or {}
+    cohorts = data.get('cohorts')
+    fmt = data.get('format', request.args.get('format', 'csv'))
+
+    if not isinstance(cohorts, dict) or not cohorts or \
+            not all(isinstance(names, list) and all(isinstance(name, str) for name in names)
+                    for names in cohorts.values()):
+        return jsonify({"error": "cohorts must map cohort names to lists of tracker names"}), 400
+    if fmt not in ('csv', 'xlsx'):
+        return jsonify({"error": "format must be 'csv' or 'xlsx'"}), 400
+
+    missing = [name for names in cohorts.values() for name in names if not tracker_exists(name)]
+    if missing:
+        return jsonify({"error": "Trackers not found", "missing": missing}), 404
+    cohorts = {cohort: [tracker_path(name) for name in names] for cohort, names in cohorts.items()}
+
+    if fmt == 'csv':
+        return Response(
+            stream_with_context(iter_cohort_csv(cohorts)),
+            mimetype='text/csv',
+            headers=_attachment("cohort_export.csv")
+        )
+
+    return _excel_response(lambda filepath: export_cohorts_excel(cohorts, filepath), "cohort_export.xlsx")
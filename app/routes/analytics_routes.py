@@ -4,7 +4,154 @@ import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
 import json
-from typing import Dict, List, Union, Optional, Tuple
+import hashlib
+import itertools
+from typing import Dict, Iterable, List, Union, Optional, Tuple
+
+def widen(values, dtype=None) -> np.ndarray:
+    """
+    Convert stored values to float64. float32 values go through their
+    shortest decimal form, so a recorded 89.7 reads back as 89.7 rather than
+    89.69999694824219. Pass `dtype` to first round computed values (e.g. a
+    median) to the storage precision.
+    """
+    values = np.asarray(values, dtype=dtype)
+    if values.dtype != np.float32:
+        return values.astype(np.float64)
+    if values.ndim == 0:
+        return np.asarray(float(str(values[()])))
+    return values.astype(str).astype(np.float64)
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P² algorithm (Jain & Chlamtac).
+    
+    Keeps five markers instead of the values, so each update is O(1). The
+    estimate is exact until five values have been seen.
+    """
+    
+    def __init__(self, p: float = 0.5):
+        self.p = p
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        self._desired = None
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray, p: float = 0.5) -> 'P2Quantile':
+        """Start from the exact quantiles of the values seen so far."""
+        sketch = cls(p)
+        if len(values) < 5:
+            sketch._initial = sorted(float(v) for v in values)
+        else:
+            last = len(values) - 1
+            # Quantiles are rounded to the precision the values are stored with
+            sketch._heights = widen(np.quantile(values, sketch._increments), values.dtype).tolist()
+            sketch._positions = [last * d for d in sketch._increments]
+            sketch._desired = list(sketch._positions)
+        return sketch
+    
+    def add(self, value: float) -> None:
+        if self._heights is None:
+            self._initial.append(value)
+            self._initial.sort()
+            if len(self._initial) == 5:
+                self._heights = self._initial
+                self._positions = [0.0, 1.0, 2.0, 3.0, 4.0]
+                self._desired = [4 * d for d in self._increments]
+            return
+        
+        q, n = self._heights, self._positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = next(i for i in range(4) if value < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    # Fall back to linear interpolation when the parabola overshoots
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+    
+    def value(self) -> float:
+        if self._heights is None:
+            return float(np.quantile(self._initial, self.p)) if self._initial else np.nan
+        return self._heights[2]
+
+class RunningStats:
+    """
+    Aggregates over a metric's non-NaN values in date order, updated per value:
+    count, Welford mean/variance, min/max, first/last/previous value and a
+    streaming median.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.first = np.nan
+        self.last = np.nan
+        self.previous = np.nan
+        self._median = P2Quantile(0.5)
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'RunningStats':
+        """Compute the aggregates for values in date order in one vectorized pass."""
+        stats = cls()
+        if len(values):
+            # Accumulate in float64 whatever the storage type
+            wide = values.astype(np.float64)
+            stats.count = len(values)
+            stats.mean = float(wide.mean())
+            stats._m2 = float(((wide - stats.mean) ** 2).sum())
+            stats.min, stats.max, stats.first, stats.last = widen(
+                np.array([values.min(), values.max(), values[0], values[-1]], dtype=values.dtype)).tolist()
+            stats.previous = float(widen(values[-2])) if len(values) > 1 else np.nan
+            stats._median = P2Quantile.from_values(values, 0.5)
+        return stats
+    
+    def add(self, value: float) -> None:
+        """Add a value dated after every value seen so far."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.count == 1:
+            self.min = self.max = self.first = value
+        else:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+        self.previous = self.last
+        self.last = value
+        self._median.add(value)
+    
+    @property
+    def std(self) -> float:
+        """Sample standard deviation, as pandas computes it."""
+        return float(np.sqrt(self._m2 / (self.count - 1))) if self.count > 1 else np.nan
+    
+    @property
+    def median(self) -> float:
+        return self._median.value()
 
 class PerformanceTracker:
     """
@@ -15,79 +162,325 @@ class PerformanceTracker:
     - Export data for further analysis
     """
     
-    def __init__(self, name: str, metrics: List[str] = None):
+    # Initial number of rows allocated for the data buffers
+    INITIAL_CAPACITY = 64
+    
+    # Journal records written between automatic snapshots
+    COMPACT_EVERY = 1000
+    
+    # Source of data versions for in-memory changes; unique across instances, so
+    # (name, version) identifies a state. A tracker loaded from disk or just saved
+    # takes a version derived from the save instead, so every load of the same
+    # saved state gets the same version.
+    _versions = itertools.count(1)
+    
+    def __init__(self, name: str, metrics: List[str] = None, dtype=np.float32):
         """
         Initialize a new performance tracker.
         
         Args:
             name: Name of the performance tracking instance
             metrics: List of metrics to track (can be added later)
+            dtype: Storage type of metric values; float32 (about 7 significant
+                digits) halves memory, pass np.float64 for full precision
         """
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != 'f':
+            raise ValueError(f"Metric values must be stored as a float type, not {self.dtype}")
+        
         self.name = name
         self.metrics = metrics or []
-        self.data = pd.DataFrame(columns=['date'] + self.metrics)
         self.goals = {}
         self.notes = {}
         
+        # Data is kept in date order in growable NumPy buffers; only the first
+        # self._size slots are in use. The DataFrame view is built lazily.
+        self._size = 0
+        self._dates = np.empty(self.INITIAL_CAPACITY, dtype='datetime64[D]')
+        self._columns = {metric: np.full(self.INITIAL_CAPACITY, np.nan, dtype=self.dtype) for metric in self.metrics}
+        self._frame = None
+        self.version = next(self._versions)
+        
+        # Running aggregates per metric; a metric missing here is recomputed on next use
+        self._stats = {}
+        
+        # Append-only change log, see enable_journal
+        self._journal = None
+        self._journal_dir = None
+        self._journal_records = 0
+        self.compact_every = self.COMPACT_EVERY
+        self.journal_sync = False
+        
         # Create directory for saving data if it doesn't exist
         self.data_dir = f"performance_data_{name.lower().replace(' ', '_')}"
         os.makedirs(self.data_dir, exist_ok=True)
-        
+    
+    @property
+    def data(self) -> pd.DataFrame:
+        """DataFrame view of the recorded data, one row per date in date order."""
+        if self._frame is None:
+            n = self._size
+            frame = {'date': np.datetime_as_string(self._dates[:n], unit='D').astype(object)}
+            for metric, values in self._columns.items():
+                frame[metric] = values[:n].copy()
+            self._frame = pd.DataFrame(frame, columns=['date'] + list(self._columns))
+        return self._frame
+    
+    @data.setter
+    def data(self, frame: pd.DataFrame) -> None:
+        """Replace all recorded data with the rows of a DataFrame with a 'date' column."""
+        frame = frame.copy()
+        if len(frame):
+            frame['date'] = pd.to_datetime(frame['date'])
+            frame = frame.sort_values('date', kind='stable')
+        
+        n = len(frame)
+        capacity = max(self.INITIAL_CAPACITY, n)
+        self._dates = np.empty(capacity, dtype='datetime64[D]')
+        self._dates[:n] = frame['date'].values.astype('datetime64[D]') if n else []
+        self._columns = {}
+        for metric in [c for c in frame.columns if c != 'date']:
+            if metric not in self.metrics:
+                self.metrics.append(metric)
+        for metric in self.metrics:
+            values = np.full(capacity, np.nan, dtype=self.dtype)
+            if metric in frame.columns:
+                values[:n] = pd.to_numeric(frame[metric], errors='coerce').to_numpy(dtype=float)
+            self._columns[metric] = values
+        self._size = n
+        self._stats = {}
+        self._invalidate()
+        if self._journal is not None:
+            self.compact()
+    
+    def __len__(self) -> int:
+        """Number of recorded dates."""
+        return self._size
+    
+    def _invalidate(self) -> None:
+        """Drop derived state after the recorded data changes."""
+        self._frame = None
+        self.version = next(self._versions)
+    
+    def _grow(self, needed: int) -> None:
+        """Ensure the buffers can hold at least `needed` rows (amortized doubling)."""
+        capacity = len(self._dates)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        dates = np.empty(capacity, dtype='datetime64[D]')
+        dates[:self._size] = self._dates[:self._size]
+        self._dates = dates
+        for metric, values in self._columns.items():
+            grown = np.full(capacity, np.nan, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[metric] = grown
+    
+    @staticmethod
+    def _to_day(date: Union[str, datetime]) -> np.datetime64:
+        """Convert a 'YYYY-MM-DD' string or datetime to a day-resolution datetime64."""
+        if isinstance(date, str):
+            date = datetime.strptime(date, "%Y-%m-%d")
+        return np.datetime64(date.strftime("%Y-%m-%d"), 'D')
+    
     def add_metric(self, metric_name: str) -> None:
         """Add a new metric to track."""
         if metric_name not in self.metrics:
             self.metrics.append(metric_name)
-            if not metric_name in self.data.columns:
-                self.data[metric_name] = np.nan
+            self._log({'op': 'add_metric', 'metric': metric_name})
+        if metric_name not in self._columns:
+            self._columns[metric_name] = np.full(len(self._dates), np.nan, dtype=self.dtype)
+            self._invalidate()
     
     def remove_metric(self, metric_name: str) -> None:
         """Remove a metric from tracking."""
         if metric_name in self.metrics:
             self.metrics.remove(metric_name)
-            if metric_name in self.data.columns:
-                self.data = self.data.drop(columns=[metric_name])
+            if metric_name in self._columns:
+                del self._columns[metric_name]
+                self._invalidate()
+            self._stats.pop(metric_name, None)
+            self._log({'op': 'remove_metric', 'metric': metric_name})
     
     def record_data(self, date: Union[str, datetime], values: Dict[str, float], 
                    note: str = None) -> None:
         """
         Record performance data for a specific date.
         
+        Appending a date after the latest one is amortized O(1); an earlier
+        date is inserted in place, shifting only the rows after it. Running
+        statistics absorb appended values directly; any other change marks
+        the affected metrics for recomputation on their next use.
+        
         Args:
             date: Date of the performance data
             values: Dictionary mapping metric names to values
             note: Optional note for this data point
         """
-        if isinstance(date, str):
-            date = datetime.strptime(date, "%Y-%m-%d")
-        
-        date_str = date.strftime("%Y-%m-%d")
+        day = self._to_day(date)
+        date_str = str(day)
         
         # Add any new metrics found in values
         for metric in values.keys():
             if metric not in self.metrics:
                 self.add_metric(metric)
         
-        # Check if this date already exists
-        if date_str in self.data['date'].values:
+        n = self._size
+        pos = int(np.searchsorted(self._dates[:n], day))
+        
+        if pos < n and self._dates[pos] == day:
             # Update existing row
             for metric, value in values.items():
-                self.data.loc[self.data['date'] == date_str, metric] = value
+                value = np.nan if value is None else value
+                self._update_stats(metric, self._columns[metric][pos], value, pos == n - 1)
+                self._columns[metric][pos] = value
         else:
-            # Create new row
-            new_row = {'date': date_str}
-            for metric in self.metrics:
-                new_row[metric] = values.get(metric, np.nan)
-            
-            self.data = pd.concat([self.data, pd.DataFrame([new_row])], ignore_index=True)
-        
-        # Sort by date
-        self.data['date'] = pd.to_datetime(self.data['date'])
-        self.data = self.data.sort_values('date')
-        self.data['date'] = self.data['date'].dt.strftime("%Y-%m-%d")
+            # Insert a new row, shifting later dates back by one
+            self._grow(n + 1)
+            if pos < n:
+                self._dates[pos + 1:n + 1] = self._dates[pos:n]
+            self._dates[pos] = day
+            for metric, column in self._columns.items():
+                if pos < n:
+                    column[pos + 1:n + 1] = column[pos:n]
+                value = values.get(metric)
+                value = np.nan if value is None else value
+                self._update_stats(metric, np.nan, value, pos == n)
+                column[pos] = value
+            self._size = n + 1
+        
+        self._invalidate()
         
         # Add note if provided
         if note:
             self.notes[date_str] = note
+        
+        self._log({
+            'op': 'record',
+            'date': date_str,
+            'values': {metric: None if value is None else float(value) for metric, value in values.items()},
+            'note': note
+        })
+    
+    def record_many(self, source: Union[pd.DataFrame, str, Iterable[Tuple[Union[str, datetime], Dict[str, float]]]],
+                    date_column: str = 'date', date_format: str = "%Y-%m-%d",
+                    metrics: List[str] = None, note_column: str = None) -> int:
+        """
+        Record many rows of performance data in one pass.
+        
+        Dates are parsed in a single vectorized call and merged with the
+        existing dates by a sorted join, so loading N rows costs O(N log N)
+        instead of one record_data call per row. Empty (NaN) cells leave any
+        existing value untouched; if a date appears more than once, its last
+        non-empty value per metric wins.
+        
+        Args:
+            source: A DataFrame, a path to a CSV file, or an iterable of
+                (date, {metric: value}) rows
+            date_column: Name of the date column in a DataFrame or CSV
+            date_format: strptime format of string dates
+            metrics: Columns to record (defaults to every column except the
+                date and note columns)
+            note_column: Optional column holding a note for each row
+            
+        Returns:
+            Number of input rows processed
+        """
+        if isinstance(source, pd.DataFrame):
+            frame = source
+        elif isinstance(source, (str, os.PathLike)):
+            frame = pd.read_csv(source)
+        else:
+            rows = list(source)
+            frame = pd.DataFrame.from_records([values for _, values in rows])
+            frame[date_column] = [date for date, _ in rows]
+        
+        if len(frame) == 0:
+            return 0
+        
+        dates = frame[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format=date_format)
+        days = dates.values.astype('datetime64[D]')
+        
+        if metrics is None:
+            metrics = [c for c in frame.columns if c not in (date_column, note_column)]
+        
+        # Add new metric columns once, up front
+        for metric in metrics:
+            if metric not in self.metrics:
+                self.add_metric(metric)
+        
+        # Collapse duplicate dates; GroupBy.last keeps the last non-NaN value
+        incoming = frame[metrics].apply(pd.to_numeric, errors='coerce')
+        incoming = incoming.groupby(days, sort=True).last()
+        new_days = incoming.index.values.astype('datetime64[D]')
+        
+        # Join the incoming dates with the existing sorted dates
+        n = self._size
+        all_days = np.union1d(self._dates[:n], new_days)
+        if len(all_days) > n:
+            self._rebuild(all_days)
+        
+        positions = np.searchsorted(self._dates[:self._size], new_days)
+        for metric in metrics:
+            values = incoming[metric].to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            self._columns[metric][positions[present]] = values[present]
+            self._stats.pop(metric, None)
+        
+        if note_column is not None:
+            notes = frame[note_column]
+            has_note = notes.notna().to_numpy()
+            for day, note in zip(np.datetime_as_string(days[has_note], unit='D'), notes[has_note]):
+                self.notes[day] = note
+        
+        self._invalidate()
+        
+        # A bulk load is persisted as a snapshot rather than one journal record per row
+        if self._journal is not None:
+            self.compact()
+        return len(frame)
+    
+    def _update_stats(self, metric: str, old: float, new: float, at_end: bool) -> None:
+        """Fold a cell change into the metric's running statistics, or mark them stale."""
+        stats = self._stats.get(metric)
+        new = self._columns[metric].dtype.type(new)
+        if stats is None or old == new or (np.isnan(old) and np.isnan(new)):
+            return
+        if at_end and np.isnan(old):
+            # A value after all of the metric's existing values, as it is stored
+            stats.add(float(widen(new)))
+        else:
+            del self._stats[metric]
+    
+    def _metric_stats(self, metric: str) -> RunningStats:
+        """Running statistics for a metric, recomputed if a change invalidated them."""
+        stats = self._stats.get(metric)
+        if stats is None:
+            values = self._columns[metric][:self._size]
+            stats = self._stats[metric] = RunningStats.from_values(values[~np.isnan(values)])
+        return stats
+    
+    def _rebuild(self, all_days: np.ndarray) -> None:
+        """Re-lay the buffers out on a sorted superset of the current dates."""
+        n = self._size
+        size = len(all_days)
+        capacity = max(len(self._dates), 1)
+        while capacity < size:
+            capacity *= 2
+        
+        old_positions = np.searchsorted(all_days, self._dates[:n])
+        dates = np.empty(capacity, dtype='datetime64[D]')
+        dates[:size] = all_days
+        for metric, values in self._columns.items():
+            rebuilt = np.full(capacity, np.nan, dtype=values.dtype)
+            rebuilt[old_positions] = values[:n]
+            self._columns[metric] = rebuilt
+        self._dates = dates
+        self._size = size
     
     def set_goal(self, metric: str, target: float, deadline: Union[str, datetime] = None,
                  description: str = None) -> None:
@@ -114,18 +507,19 @@ class PerformanceTracker:
             'description': description,
             'created_at': datetime.now().strftime("%Y-%m-%d")
         }
+        self.version = next(self._versions)
+        self._log({'op': 'goal', 'metric': metric, 'goal': self.goals[metric]})
     
     def get_current_value(self, metric: str) -> Optional[float]:
         """Get the most recent value for a specific metric."""
-        if not len(self.data) or metric not in self.metrics:
+        if not self._size or metric not in self.metrics:
             return None
         
-        latest_row = self.data.iloc[-1]
-        return latest_row[metric]
+        return widen(self._columns[metric][self._size - 1])[()]
     
     def calculate_progress(self, metric: str) -> Optional[Dict]:
         """Calculate progress towards a goal for a specific metric."""
-        if metric not in self.goals or metric not in self.metrics or len(self.data) == 0:
+        if metric not in self.goals or metric not in self.metrics or not self._size:
             return None
         
         current_value = self.get_current_value(metric)
@@ -135,12 +529,8 @@ class PerformanceTracker:
         goal = self.goals[metric]
         target = goal['target']
         
-        # Find initial value (first non-NaN value)
-        mask = ~self.data[metric].isna()
-        if not any(mask):
-            return None
-            
-        initial_value = self.data[metric][mask].iloc[0]
+        # Initial value is the first non-NaN value
+        initial_value = self._metric_stats(metric).first
         
         # Calculate progress
         total_change_needed = target - initial_value
@@ -175,22 +565,23 @@ class PerformanceTracker:
         Returns:
             matplotlib Figure object
         """
-        if metric not in self.metrics or len(self.data) == 0:
+        if metric not in self.metrics or not self._size:
             raise ValueError(f"No data available for metric: {metric}")
         
-        # Create a copy of the data with proper date parsing
-        plot_data = self.data.copy()
-        plot_data['date'] = pd.to_datetime(plot_data['date'])
-        
-        # Filter for last n days if specified
+        # Slice the sorted buffers for last n days if specified (dates are
+        # midnights, so only days after the cutoff day are on or after the cutoff)
+        start = 0
         if last_n_days:
             cutoff_date = datetime.now() - timedelta(days=last_n_days)
-            plot_data = plot_data[plot_data['date'] >= cutoff_date]
+            start = int(np.searchsorted(self._dates[:self._size], np.datetime64(cutoff_date, 'D'), side='right'))
+        dates = self._dates[start:self._size]
+        values = self._columns[metric][start:self._size]
         
         # Filter out NaN values for this metric
-        plot_data = plot_data.dropna(subset=[metric])
+        present = ~np.isnan(values)
+        dates, values = dates[present], values[present]
         
-        if len(plot_data) == 0:
+        if len(values) == 0:
             raise ValueError(f"No non-NaN data available for metric: {metric}")
         
         # Create plot
@@ -200,7 +591,7 @@ class PerformanceTracker:
             close_plot = True
         
         # Plot the metric data
-        ax.plot(plot_data['date'], plot_data[metric], marker='o', linestyle='-', label=metric)
+        ax.plot(dates, values, marker='o', linestyle='-', label=metric)
         
         # Add goal line if requested and available
         if show_goal and metric in self.goals:
@@ -210,7 +601,7 @@ class PerformanceTracker:
             # Add deadline line if available
             if self.goals[metric]['deadline']:
                 deadline = datetime.strptime(self.goals[metric]['deadline'], "%Y-%m-%d")
-                if deadline >= min(plot_data['date']) and deadline <= datetime.now() + timedelta(days=30):
+                if deadline >= pd.Timestamp(dates[0]) and deadline <= datetime.now() + timedelta(days=30):
                     ax.axvline(x=deadline, color='g', linestyle=':', label=f"Deadline: {self.goals[metric]['deadline']}")
         
         # Add labels and title
@@ -220,24 +611,25 @@ class PerformanceTracker:
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        # Format x-axis to prevent crowding
-        if len(plot_data) > 10:
-            plt.xticks(rotation=45)
+        # Format x-axis to prevent crowding (on this axis, not pyplot's current one)
+        if len(values) > 10:
+            ax.tick_params(axis='x', labelrotation=45)
             ax.xaxis.set_major_locator(plt.MaxNLocator(10))
         
-        plt.tight_layout()
-        
         if close_plot:
+            fig.tight_layout()
             return fig
         return ax.figure
     
-    def plot_dashboard(self, metrics: List[str] = None, last_n_days: int = 30) -> plt.Figure:
+    def plot_dashboard(self, metrics: List[str] = None, last_n_days: int = 30, fig=None) -> plt.Figure:
         """
         Generate a dashboard with plots for multiple metrics.
         
         Args:
             metrics: List of metrics to include (defaults to all)
             last_n_days: Number of days to show
+            fig: Optional matplotlib Figure to draw on, e.g. a
+                matplotlib.figure.Figure not managed by pyplot
             
         Returns:
             matplotlib Figure object
@@ -253,7 +645,11 @@ class PerformanceTracker:
         cols = min(3, n_metrics)
         rows = (n_metrics + cols - 1) // cols
         
-        fig, axes = plt.subplots(rows, cols, figsize=(5*cols, 4*rows))
+        if fig is None:
+            fig, axes = plt.subplots(rows, cols, figsize=(5*cols, 4*rows))
+        else:
+            fig.set_size_inches(5*cols, 4*rows)
+            axes = fig.subplots(rows, cols)
         
         # Handle case with only one subplot
         if n_metrics == 1:
@@ -274,7 +670,7 @@ class PerformanceTracker:
         for i in range(len(metrics_to_plot), len(axes)):
             axes[i].axis('off')
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     
     def generate_report(self) -> Dict:
@@ -283,10 +679,10 @@ class PerformanceTracker:
             'name': self.name,
             'date_generated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'metrics_count': len(self.metrics),
-            'data_points_count': len(self.data),
+            'data_points_count': self._size,
             'date_range': {
-                'start': min(self.data['date']) if len(self.data) else None,
-                'end': max(self.data['date']) if len(self.data) else None
+                'start': str(self._dates[0]) if self._size else None,
+                'end': str(self._dates[self._size - 1]) if self._size else None
             },
             'current_values': {},
             'goals': {},
@@ -308,27 +704,47 @@ class PerformanceTracker:
         
         return report
     
-    def save_data(self, filename: str = None) -> str:
+    def save_data(self, filename: str = None, format: str = 'columnar') -> str:
         """
         Save the current state to disk.
         
+        The default columnar format is a directory holding one NumPy .npy
+        file for the dates and one per metric, plus a small meta.json sidecar
+        with the metrics, goals and notes. Saving again overwrites the same
+        directory instead of creating a new snapshot file. To persist each
+        change as it is made, see enable_journal.
+        
         Args:
-            filename: Optional filename, defaults to timestamped name
+            filename: Optional file/directory name inside data_dir; a name
+                ending in .json selects the legacy JSON format
+            format: 'columnar' (default) or 'json'
             
         Returns:
-            Path to the saved file
+            Path to the saved directory or file
         """
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.name.lower().replace(' ', '_')}_{timestamp}.json"
+        slug = self.name.lower().replace(' ', '_')
+        if filename is not None and filename.endswith('.json'):
+            format = 'json'
         
-        filepath = os.path.join(self.data_dir, filename)
+        if format == 'json':
+            if filename is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"{slug}_{timestamp}.json"
+            return self._save_json(os.path.join(self.data_dir, filename))
         
-        # Prepare data for serialization
+        return self._save_columnar(os.path.join(self.data_dir, filename or slug))
+    
+    def _save_json(self, filepath: str) -> str:
+        # Prepare data for serialization; values go through widen so float32
+        # cells are written in their shortest form (89.7, not 89.69999694824219)
+        frame = self.data.copy()
+        for metric in self._columns:
+            frame[metric] = widen(frame[metric].to_numpy())
         save_data = {
             'name': self.name,
             'metrics': self.metrics,
-            'data': self.data.to_dict(orient='records'),
+            'dtype': self.dtype.name,
+            'data': frame.to_dict(orient='records'),
             'goals': self.goals,
             'notes': self.notes,
             'saved_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -339,88 +755,442 @@ class PerformanceTracker:
             
         return filepath
     
+    @staticmethod
+    def _write_atomic(path: str, write) -> None:
+        """Write a file through a temporary name so readers never see a partial file."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    
+    def _save_columnar(self, dirpath: str) -> str:
+        os.makedirs(dirpath, exist_ok=True)
+        n = self._size
+        
+        # Each snapshot writes new file names, so the previous snapshot stays
+        # complete until the sidecar that references the new one is in place
+        generation = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        dates_file = f"dates_{generation}.npy"
+        self._write_atomic(os.path.join(dirpath, dates_file),
+                           lambda f: np.save(f, self._dates[:n]))
+        columns = {}
+        for i, metric in enumerate(self._columns):
+            filename = f"col_{i}_{generation}.npy"
+            self._write_atomic(os.path.join(dirpath, filename),
+                               lambda f, values=self._columns[metric]: np.save(f, values[:n]))
+            columns[metric] = filename
+        
+        # The sidecar is written last, so it only ever references complete column files
+        meta = {
+            'name': self.name,
+            'metrics': self.metrics,
+            'dtype': self.dtype.name,
+            'generation': generation,
+            'dates': dates_file,
+            'columns': columns,
+            'rows': n,
+            'goals': self.goals,
+            'notes': self.notes,
+            'saved_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self._write_atomic(os.path.join(dirpath, 'meta.json'),
+                           lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        
+        # The snapshot now covers everything in the journal
+        if self._journal is not None and os.path.abspath(dirpath) == os.path.abspath(self._journal_dir):
+            self._journal.seek(0)
+            self._journal.truncate()
+            self._journal_records = 0
+        self.version = self._snapshot_version(meta, 0)
+        
+        # Remove files left over from earlier snapshots
+        referenced = set(columns.values()) | {dates_file}
+        for filename in os.listdir(dirpath):
+            if filename.endswith('.npy') and filename not in referenced:
+                try:
+                    os.remove(os.path.join(dirpath, filename))
+                except OSError:
+                    # Still memory-mapped on platforms that lock mapped files; removed by a later save
+                    pass
+        
+        return dirpath
+    
+    def enable_journal(self, dirpath: str = None, compact_every: int = None, sync: bool = False) -> str:
+        """
+        Persist every change as it is made through an append-only journal.
+        
+        Each record_data, set_goal, add_metric and remove_metric call appends
+        one JSON line to <dirpath>/journal.log and flushes it, so the cost of
+        persisting a change does not depend on how much history there is.
+        Every `compact_every` records the journal is folded into a columnar
+        snapshot in the same directory and truncated. load_data on the
+        directory replays the snapshot plus the journal tail.
+        
+        Args:
+            dirpath: Snapshot directory (defaults to the one save_data uses)
+            compact_every: Records between automatic snapshots
+            sync: fsync after every record, so a power loss loses at most the
+                record being written (otherwise an OS crash can lose what the
+                OS had not yet written out)
+        
+        Returns:
+            Path to the snapshot directory
+        """
+        self.close_journal()
+        if dirpath is None:
+            dirpath = os.path.join(self.data_dir, self.name.lower().replace(' ', '_'))
+        if compact_every is not None:
+            self.compact_every = compact_every
+        self.journal_sync = sync
+        
+        os.makedirs(dirpath, exist_ok=True)
+        self._journal_dir = dirpath
+        self._journal = open(os.path.join(dirpath, 'journal.log'), 'a', encoding='utf-8')
+        self._journal_records = 0
+        
+        # The journal is only meaningful on top of a snapshot of the current state
+        self.compact()
+        return dirpath
+    
+    def close_journal(self) -> None:
+        """Stop journaling and close the journal file."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            self._journal_dir = None
+    
+    def compact(self) -> str:
+        """Write a snapshot of the current state and truncate the journal."""
+        if self._journal is None:
+            raise ValueError("Journaling is not enabled")
+        return self._save_columnar(self._journal_dir)
+    
+    def _log(self, record: Dict) -> None:
+        """Append one change to the journal, if journaling is enabled."""
+        if self._journal is None:
+            return
+        
+        self._journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._journal.flush()
+        if self.journal_sync:
+            os.fsync(self._journal.fileno())
+        
+        self._journal_records += 1
+        if self._journal_records >= self.compact_every:
+            self.compact()
+    
+    @staticmethod
+    def _journal_entries(filepath: str) -> Iterable[Dict]:
+        """Yield the records of a journal file, stopping at a torn final line."""
+        if not os.path.exists(filepath):
+            return
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    return
+    
+    def _replay(self, filepath: str) -> int:
+        """Apply the changes recorded in a journal file; returns how many were applied."""
+        applied = 0
+        for record in self._journal_entries(filepath):
+            op = record['op']
+            if op == 'record':
+                self.record_data(record['date'], record['values'], record.get('note'))
+            elif op == 'goal':
+                self.add_metric(record['metric'])
+                self.goals[record['metric']] = record['goal']
+            elif op == 'add_metric':
+                self.add_metric(record['metric'])
+            elif op == 'remove_metric':
+                self.remove_metric(record['metric'])
+            applied += 1
+        
+        return applied
+    
     @classmethod
-    def load_data(cls, filepath: str) -> 'PerformanceTracker':
+    def open_journal(cls, name: str, metrics: List[str] = None, compact_every: int = None,
+                     sync: bool = False, dtype=np.float32) -> 'PerformanceTracker':
+        """
+        Open a journaled tracker, recovering its saved state if there is one.
+        
+        Args:
+            name: Name of the performance tracking instance
+            metrics: Metrics to track (added to any recovered ones)
+            compact_every: Records between automatic snapshots
+            sync: fsync every journal record
+            dtype: Storage type of metric values for a new tracker (a
+                recovered one keeps the type it was saved with)
+        
+        Returns:
+            PerformanceTracker instance with journaling enabled
+        """
+        tracker = cls(name=name, metrics=metrics, dtype=dtype)
+        dirpath = os.path.join(tracker.data_dir, name.lower().replace(' ', '_'))
+        if os.path.exists(os.path.join(dirpath, 'meta.json')):
+            tracker = cls.load_data(dirpath)
+            for metric in metrics or []:
+                tracker.add_metric(metric)
+        
+        tracker.enable_journal(dirpath, compact_every=compact_every, sync=sync)
+        return tracker
+    
+    @classmethod
+    def load_data(cls, filepath: str, mmap: bool = True) -> 'PerformanceTracker':
         """
         Load a saved performance tracker from disk.
         
+        Columnar saves are memory-mapped by default, so only the columns
+        that are actually read are paged in. Mapped columns are copy-on-write:
+        changes made in memory are never written back to the saved files.
+        
         Args:
-            filepath: Path to the saved file
+            filepath: Path to a columnar save directory or a legacy JSON file
+            mmap: Memory-map columnar data instead of reading it into memory
             
         Returns:
             PerformanceTracker instance
         """
+        if os.path.isdir(filepath):
+            return cls._load_columnar(filepath, mmap)
+        
         with open(filepath, 'r') as f:
-            data = json.load(f)
+            text = f.read()
+        data = json.loads(text)
         
-        # Create a new instance
-        tracker = cls(name=data['name'], metrics=data['metrics'])
+        # Create a new instance; saves from before dtype was recorded hold float64 values
+        tracker = cls(name=data['name'], metrics=data['metrics'], dtype=data.get('dtype', 'float64'))
         
         # Load the data
         tracker.data = pd.DataFrame(data['data'])
         tracker.goals = data['goals']
         tracker.notes = data['notes']
+        tracker.version = 'json:' + hashlib.sha256(text.encode('utf-8')).hexdigest()
         
         return tracker
     
-    def export_to_csv(self, filepath: str = None) -> str:
-        """Export data to CSV file."""
+    @staticmethod
+    def _snapshot_version(meta: Dict, journal_records: int) -> str:
+        """
+        Version of the state made of a columnar snapshot plus the first
+        `journal_records` records of its journal. The journal only grows
+        between snapshots, so equal versions mean equal data.
+        """
+        # Saves from before the generation was recorded carry it in the dates file name
+        generation = meta.get('generation') or meta.get('dates') or meta['saved_at']
+        return f"{generation}:{journal_records}"
+    
+    @classmethod
+    def saved_version(cls, dirpath: str) -> str:
+        """
+        The version load_data would give a columnar save, read from its
+        meta.json and journal without loading any data. Use it to check a
+        cache before deciding to load the tracker.
+        """
+        with open(os.path.join(dirpath, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        records = sum(1 for _ in cls._journal_entries(os.path.join(dirpath, 'journal.log')))
+        return cls._snapshot_version(meta, records)
+    
+    @classmethod
+    def _load_columnar(cls, dirpath: str, mmap: bool = True) -> 'PerformanceTracker':
+        with open(os.path.join(dirpath, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        mmap_mode = 'c' if mmap else None
+        
+        # Saves from before dtype was recorded hold float64 columns
+        tracker = cls(name=meta['name'], metrics=meta['metrics'], dtype=meta.get('dtype', 'float64'))
+        n = meta['rows']
+        if n:
+            tracker._dates = np.load(os.path.join(dirpath, meta.get('dates', 'dates.npy')), mmap_mode=mmap_mode)
+            tracker._columns = {
+                metric: np.load(os.path.join(dirpath, filename), mmap_mode=mmap_mode)
+                for metric, filename in meta['columns'].items()
+            }
+            tracker._size = n
+        tracker.goals = meta['goals']
+        tracker.notes = meta['notes']
+        
+        # Apply changes journaled since the snapshot
+        applied = tracker._replay(os.path.join(dirpath, 'journal.log'))
+        tracker.version = cls._snapshot_version(meta, applied)
+        
+        return tracker
+    
+    @staticmethod
+    def read_metric(dirpath: str, metric: str) -> pd.Series:
+        """
+        Read a single metric from a columnar save without loading the rest.
+        
+        Changes journaled since the snapshot are applied to this metric
+        only; without a journal tail the snapshot column is memory-mapped
+        and returned as is.
+        
+        Returns:
+            Series of the metric's values indexed by date
+        """
+        with open(os.path.join(dirpath, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        
+        if meta['rows']:
+            dates = np.load(os.path.join(dirpath, meta.get('dates', 'dates.npy')), mmap_mode='r')
+        else:
+            dates = np.empty(0, dtype='datetime64[D]')
+        exists = metric in meta['columns']
+        base = np.load(os.path.join(dirpath, meta['columns'][metric]), mmap_mode='r') if exists and meta['rows'] else None
+        
+        # Replay the journal tail for this metric: every recorded date becomes
+        # a row, but only values of this metric are kept
+        new_days, changes, replayed = set(), {}, False
+        for record in PerformanceTracker._journal_entries(os.path.join(dirpath, 'journal.log')):
+            replayed = True
+            op = record['op']
+            if op == 'record':
+                day = PerformanceTracker._to_day(record['date'])
+                new_days.add(day)
+                if metric in record['values']:
+                    exists = True
+                    value = record['values'][metric]
+                    changes[day] = np.nan if value is None else value
+            elif op in ('goal', 'add_metric') and record['metric'] == metric:
+                exists = True
+            elif op == 'remove_metric' and record['metric'] == metric:
+                # Removing a metric drops its values; a later re-add starts empty
+                exists, base, changes = False, None, {}
+        
+        if not exists:
+            raise KeyError(f"Metric not found in saved data: {metric}")
+        if not replayed and base is not None:
+            return pd.Series(base, index=pd.DatetimeIndex(dates, name='date'), name=metric)
+        
+        all_dates = np.union1d(dates, np.array(sorted(new_days), dtype='datetime64[D]'))
+        values = np.full(len(all_dates), np.nan, dtype=meta.get('dtype', 'float64'))
+        if base is not None:
+            values[np.searchsorted(all_dates, dates)] = base
+        if changes:
+            days = np.array(list(changes), dtype='datetime64[D]')
+            values[np.searchsorted(all_dates, days)] = list(changes.values())
+        return pd.Series(values, index=pd.DatetimeIndex(all_dates, name='date'), name=metric)
+    
+    def iter_blocks(self, chunk_rows: int = 10000) -> Iterable[pd.DataFrame]:
+        """
+        Yield the recorded data in date order as DataFrames of at most
+        `chunk_rows` rows, so exports never hold more than one block.
+        """
+        columns = ['date'] + list(self._columns)
+        for start in range(0, self._size, chunk_rows):
+            end = min(start + chunk_rows, self._size)
+            block = {'date': np.datetime_as_string(self._dates[start:end], unit='D').astype(object)}
+            for metric, values in self._columns.items():
+                block[metric] = values[start:end]
+            yield pd.DataFrame(block, columns=columns)
+    
+    def iter_csv(self, chunk_rows: int = 10000) -> Iterable[str]:
+        """Yield the data as CSV text, the header first and then one chunk per block of rows."""
+        yield pd.DataFrame(columns=['date'] + list(self._columns)).to_csv(index=False)
+        for block in self.iter_blocks(chunk_rows):
+            yield block.to_csv(index=False, header=False)
+    
+    def export_to_csv(self, filepath: str = None, chunk_rows: int = 10000) -> str:
+        """Export data to CSV file, written one block of rows at a time."""
         if filepath is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filepath = os.path.join(self.data_dir, f"{self.name.lower().replace(' ', '_')}_{timestamp}.csv")
         
-        self.data.to_csv(filepath, index=False)
+        with open(filepath, 'w', newline='') as f:
+            for chunk in self.iter_csv(chunk_rows):
+                f.write(chunk)
         return filepath
     
-    def export_to_excel(self, filepath: str = None) -> str:
-        """Export data to Excel file with formatted dashboard."""
+    def write_rows(self, worksheet, row: int, metrics: List[str] = None, prefix: Tuple = (),
+                   chunk_rows: int = 10000) -> int:
+        """
+        Write the data rows to an xlsxwriter worksheet in date order.
+        
+        Rows are written strictly top to bottom, so the worksheet may belong
+        to a workbook in constant_memory mode. Empty (NaN) values are left blank.
+        
+        Args:
+            worksheet: xlsxwriter worksheet
+            row: Index of the first row to write
+            metrics: Metric columns to write, in order (defaults to all);
+                metrics this tracker doesn't have are left blank
+            prefix: Values written before the date on every row (e.g. the student)
+            chunk_rows: Rows converted from the buffers at a time
+            
+        Returns:
+            Index of the row after the last one written
+        """
+        metrics = self.metrics if metrics is None else metrics
+        first_col = len(prefix)
+        for start in range(0, self._size, chunk_rows):
+            end = min(start + chunk_rows, self._size)
+            dates = np.datetime_as_string(self._dates[start:end], unit='D').tolist()
+            columns = [(first_col + 1 + j, widen(self._columns[metric][start:end]).tolist())
+                       for j, metric in enumerate(metrics) if metric in self._columns]
+            for i, date in enumerate(dates):
+                if prefix:
+                    worksheet.write_row(row, 0, prefix)
+                worksheet.write_string(row, first_col, date)
+                for col, values in columns:
+                    value = values[i]
+                    if value == value:  # NaN cells stay blank
+                        worksheet.write_number(row, col, value)
+                row += 1
+        return row
+    
+    def export_to_excel(self, filepath: str = None, chunk_rows: int = 10000) -> str:
+        """
+        Export data to Excel file with formatted dashboard.
+        
+        The workbook is written with xlsxwriter in constant_memory mode, which
+        flushes each row to disk as it is completed.
+        """
+        import xlsxwriter
+        
         if filepath is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filepath = os.path.join(self.data_dir, f"{self.name.lower().replace(' ', '_')}_{timestamp}.xlsx")
         
-        # Create Excel writer
-        with pd.ExcelWriter(filepath, engine='xlsxwriter') as writer:
+        workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True})
+        header = workbook.add_format({'bold': True, 'border': 1})
+        try:
             # Write data
-            self.data.to_excel(writer, sheet_name='Data', index=False)
+            data_sheet = workbook.add_worksheet('Data')
+            data_sheet.write_row(0, 0, ['date'] + self.metrics, header)
+            self.write_rows(data_sheet, 1, chunk_rows=chunk_rows)
             
             # Write goals
-            goals_df = pd.DataFrame(columns=['Metric', 'Target', 'Deadline', 'Description'])
-            for metric, goal in self.goals.items():
-                goals_df = pd.concat([goals_df, pd.DataFrame([{
-                    'Metric': metric,
-                    'Target': goal['target'],
-                    'Deadline': goal['deadline'],
-                    'Description': goal['description']
-                }])], ignore_index=True)
-            
-            goals_df.to_excel(writer, sheet_name='Goals', index=False)
+            goals_sheet = workbook.add_worksheet('Goals')
+            goals_sheet.write_row(0, 0, ['Metric', 'Target', 'Deadline', 'Description'], header)
+            for row, (metric, goal) in enumerate(self.goals.items(), start=1):
+                goals_sheet.write_row(row, 0, [metric, goal['target'], goal['deadline'], goal['description']])
             
             # Write progress report
             report = self.generate_report()
-            progress_data = []
+            progress_sheet = workbook.add_worksheet('Progress')
+            progress_sheet.write_row(0, 0, ['Metric', 'Initial', 'Current', 'Target', 'Progress (%)', 'Remaining'], header)
             
-            for metric in self.metrics:
+            for row, metric in enumerate(self.metrics, start=1):
                 if metric in report['progress'] and report['progress'][metric]:
                     prog = report['progress'][metric]
-                    progress_data.append({
-                        'Metric': metric,
-                        'Initial': prog['initial'],
-                        'Current': prog['current'],
-                        'Target': prog['target'],
-                        'Progress (%)': f"{prog['progress_percentage']:.1f}%",
-                        'Remaining': prog['remaining']
-                    })
+                    progress_sheet.write_row(row, 0, [
+                        metric,
+                        prog['initial'],
+                        prog['current'],
+                        prog['target'],
+                        f"{prog['progress_percentage']:.1f}%",
+                        prog['remaining']
+                    ])
                 else:
                     current = report['current_values'].get(metric)
-                    progress_data.append({
-                        'Metric': metric,
-                        'Current': None if current is None else current
-                    })
-            
-            pd.DataFrame(progress_data).to_excel(writer, sheet_name='Progress', index=False)
+                    progress_sheet.write_string(row, 0, metric)
+                    if current is not None:
+                        progress_sheet.write_number(row, 2, current)
             
             # Add conditional formatting for progress
-            progress_sheet = writer.sheets['Progress']
             progress_sheet.conditional_format('E2:E1000', {
                 'type': 'data_bar',
                 'bar_color': '#638EC6',
@@ -429,28 +1199,56 @@ class PerformanceTracker:
                 'max_type': 'num',
                 'max_value': 100
             })
+        finally:
+            workbook.close()
         
         return filepath
 
-    def get_stats(self, metric: str) -> Dict:
-        """Get statistical information about a metric."""
-        if metric not in self.metrics or len(self.data) == 0:
+    def get_stats(self, metric: str, exact: bool = False) -> Dict:
+        """
+        Get statistical information about a metric.
+        
+        By default the values come from running aggregates kept up to date
+        as data is recorded, so the call does not scan the column; the median
+        is then a streaming estimate once a metric has been appended to since
+        it was last computed. Pass exact=True to compute everything from the
+        recorded values.
+        """
+        if metric not in self.metrics or not self._size:
             return None
         
+        if not exact:
+            stats = self._metric_stats(metric)
+            if not stats.count:
+                return None
+            return {
+                'count': stats.count,
+                'min': stats.min,
+                'max': stats.max,
+                'mean': stats.mean,
+                'median': stats.median,
+                'std': stats.std,
+                'last_value': stats.last,
+                'trend': 'increasing' if stats.count > 1 and stats.last > stats.previous else
+                        'decreasing' if stats.count > 1 and stats.last < stats.previous else 'stable'
+            }
+        
         # Filter out NaN values
         values = self.data[metric].dropna()
         
         if len(values) == 0:
             return None
-            
+        
+        # Aggregate in float64; stored values are read back through widen
+        wide = values.astype(np.float64)
         return {
             'count': len(values),
-            'min': values.min(),
-            'max': values.max(),
-            'mean': values.mean(),
-            'median': values.median(),
-            'std': values.std(),
-            'last_value': values.iloc[-1] if len(values) > 0 else None,
+            'min': widen(values.min())[()],
+            'max': widen(values.max())[()],
+            'mean': wide.mean(),
+            'median': widen(wide.median(), values.dtype)[()],
+            'std': wide.std(),
+            'last_value': widen(values.iloc[-1])[()] if len(values) > 0 else None,
             'trend': 'increasing' if len(values) > 1 and values.iloc[-1] > values.iloc[-2] else
                     'decreasing' if len(values) > 1 and values.iloc[-1] < values.iloc[-2] else 'stable'
         }
@@ -476,6 +1274,7 @@ class PerformanceTracker:
         
         # Drop NaN values
         metric_data = analysis_data[metric].dropna()
+        metric_data = metric_data.astype(np.float64)
         
         if len(metric_data) < 2:
             return {'message': 'Not enough data points for trend analysis'}
@@ -548,72 +1347,91 @@ class PerformanceTracker:
         """
         if metric not in self.metrics:
             return None
-            
-        # Parse dates
-        p1_start = datetime.strptime(period1[0], "%Y-%m-%d")
-        p1_end = datetime.strptime(period1[1], "%Y-%m-%d")
-        p2_start = datetime.strptime(period2[0], "%Y-%m-%d")
-        p2_end = datetime.strptime(period2[1], "%Y-%m-%d")
-        
-        # Create a copy with datetime index
-        analysis_data = self.data.copy()
-        analysis_data['date'] = pd.to_datetime(analysis_data['date'])
-        
-        # Filter data for each period
-        p1_data = analysis_data[(analysis_data['date'] >= p1_start) & 
-                              (analysis_data['date'] <= p1_end)][metric].dropna()
-        
-        p2_data = analysis_data[(analysis_data['date'] >= p2_start) & 
-                              (analysis_data['date'] <= p2_end)][metric].dropna()
         
-        if len(p1_data) == 0 or len(p2_data) == 0:
+        result = self.compare_many_periods(metric, [period1, period2])
+        p1, p2 = result['periods']
+        if p1['stats'] is None or p2['stats'] is None:
             return {'message': 'Insufficient data for one or both periods'}
-            
-        # Calculate statistics for each period
-        p1_stats = {
-            'mean': p1_data.mean(),
-            'median': p1_data.median(),
-            'min': p1_data.min(),
-            'max': p1_data.max(),
-            'std': p1_data.std(),
-            'count': len(p1_data)
+        
+        return {
+            'period1': p1,
+            'period2': p2,
+            'comparison': result['changes'][0]
         }
+    
+    def _window(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ranges [lo, hi) of inclusive date windows, by binary search on the sorted dates."""
+        dates = self._dates[:self._size]
+        return np.searchsorted(dates, starts, side='left'), np.searchsorted(dates, ends, side='right')
+    
+    @staticmethod
+    def _period_stats(values: np.ndarray) -> Optional[Dict]:
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return None
         
-        p2_stats = {
-            'mean': p2_data.mean(),
-            'median': p2_data.median(),
-            'min': p2_data.min(),
-            'max': p2_data.max(),
-            'std': p2_data.std(),
-            'count': len(p2_data)
+        wide = values.astype(np.float64)
+        return {
+            'mean': float(wide.mean()),
+            'median': float(widen(np.median(wide), values.dtype)),
+            'min': float(widen(values.min())),
+            'max': float(widen(values.max())),
+            'std': float(wide.std(ddof=1)) if len(values) > 1 else np.nan,
+            'count': len(values)
         }
+    
+    def compare_many_periods(self, metric: str, periods: List[Tuple[str, str]]) -> Dict:
+        """
+        Compare metric performance across any number of time periods.
         
-        # Calculate changes
-        mean_change = p2_stats['mean'] - p1_stats['mean']
-        mean_change_pct = (mean_change / p1_stats['mean'] * 100) if p1_stats['mean'] != 0 else float('inf')
+        All period boundaries are located with one binary search over the
+        sorted dates, and each period's statistics are computed on a view of
+        its rows, so nothing outside the periods is read.
         
-        median_change = p2_stats['median'] - p1_stats['median']
-        median_change_pct = (median_change / p1_stats['median'] * 100) if p1_stats['median'] != 0 else float('inf')
+        Args:
+            metric: Metric to compare
+            periods: List of (start_date, end_date) tuples, both inclusive
+            
+        Returns:
+            Dictionary with the statistics of each period ('stats' is None for
+            a period without data) and the change between each consecutive
+            pair of periods (None when either has no data)
+        """
+        if metric not in self.metrics:
+            return None
         
-        return {
-            'period1': {
-                'start': period1[0],
-                'end': period1[1],
-                'stats': p1_stats
-            },
-            'period2': {
-                'start': period2[0],
-                'end': period2[1],
-                'stats': p2_stats
-            },
-            'comparison': {
+        starts = np.array([start for start, _ in periods], dtype='datetime64[D]')
+        ends = np.array([end for _, end in periods], dtype='datetime64[D]')
+        lo, hi = self._window(starts, ends)
+        column = self._columns[metric]
+        
+        results = [
+            {'start': start, 'end': end, 'stats': self._period_stats(column[a:b])}
+            for (start, end), a, b in zip(periods, lo, hi)
+        ]
+        
+        changes = []
+        for before, after in zip(results, results[1:]):
+            before, after = before['stats'], after['stats']
+            if before is None or after is None:
+                changes.append(None)
+                continue
+            
+            mean_change = after['mean'] - before['mean']
+            mean_change_pct = (mean_change / before['mean'] * 100) if before['mean'] != 0 else float('inf')
+            
+            median_change = after['median'] - before['median']
+            median_change_pct = (median_change / before['median'] * 100) if before['median'] != 0 else float('inf')
+            
+            changes.append({
                 'mean_change': mean_change,
                 'mean_change_percentage': mean_change_pct,
                 'median_change': median_change,
                 'median_change_percentage': median_change_pct,
                 'improved': mean_change > 0  # Assumes higher values are better
-            }
-        }
+            })
+        
+        return {'metric': metric, 'periods': results, 'changes': changes}
 
 # Example usage
 if __name__ == "__main__":
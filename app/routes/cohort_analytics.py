@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Union
+
+class CohortAnalytics:
+    """
+    Vectorized analytics across many students' performance series.
+
+    All observations live in one long-format table sorted by series
+    (student, metric) and date. Statistics, trend regressions, rolling
+    averages and goal progress for every series are computed in single
+    NumPy passes over that table instead of one PerformanceTracker call per
+    student, and can be summarized per class or grade.
+    """
+
+    def __init__(self, data: pd.DataFrame, goals: pd.DataFrame = None):
+        """
+        Build a cohort from long-format data.
+
+        Args:
+            data: DataFrame with 'student', 'metric', 'date' and 'value'
+                columns, plus an optional 'group' column (class, grade, ...)
+            goals: Optional DataFrame with 'student', 'metric' and 'target' columns
+        """
+        data = data.dropna(subset=['value'])
+        groups = data['group'].to_numpy() if 'group' in data.columns else np.full(len(data), None)
+
+        # Number the (student, metric) series and sort observations by series, then date
+        student_codes, students = pd.factorize(data['student'])
+        metric_codes, metrics = pd.factorize(data['metric'])
+        series_key = student_codes.astype(np.int64) * max(len(metrics), 1) + metric_codes
+        dates = pd.to_datetime(data['date']).values.astype('datetime64[D]')
+        order = np.lexsort((dates, series_key))
+
+        series_key = series_key[order]
+        self._values = data['value'].to_numpy(dtype=float)[order]
+        self._dates = dates[order]
+
+        # Boundaries of each series in the sorted arrays
+        self._starts = np.flatnonzero(np.r_[True, series_key[1:] != series_key[:-1]]) if len(order) else np.array([], dtype=int)
+        self._counts = np.diff(np.r_[self._starts, len(order)])
+        self._series_id = np.repeat(np.arange(len(self._starts)), self._counts)
+
+        first = order[self._starts] if len(order) else np.array([], dtype=int)
+        self.series = pd.DataFrame({
+            'student': np.asarray(students)[student_codes[first]],
+            'metric': np.asarray(metrics)[metric_codes[first]],
+            'group': groups[first]
+        })
+        self.goals = goals
+
+    @classmethod
+    def from_trackers(cls, trackers: Union[Dict[str, 'PerformanceTracker'], Iterable['PerformanceTracker']],
+                      groups: Dict[str, str] = None) -> 'CohortAnalytics':
+        """
+        Build a cohort from PerformanceTracker instances.
+
+        Args:
+            trackers: Mapping of student id to tracker, or trackers keyed by their name
+            groups: Optional mapping of student id to class/grade
+        """
+        if not isinstance(trackers, dict):
+            trackers = list(trackers)
+            names = [tracker.name for tracker in trackers]
+            duplicates = sorted({name for name in names if names.count(name) > 1})
+            if duplicates:
+                raise ValueError(f"Duplicate tracker names: {', '.join(duplicates)}; pass a dict keyed by student id")
+            trackers = dict(zip(names, trackers))
+        groups = groups or {}
+
+        frames = []
+        goal_rows = []
+        for student, tracker in trackers.items():
+            frame = tracker.data.melt(id_vars='date', var_name='metric', value_name='value')
+            frame['student'] = student
+            frame['group'] = groups.get(student)
+            frames.append(frame)
+            for metric, goal in tracker.goals.items():
+                goal_rows.append({'student': student, 'metric': metric, 'target': goal['target']})
+
+        data = pd.concat(frames, ignore_index=True) if frames else \
+            pd.DataFrame(columns=['date', 'metric', 'value', 'student', 'group'])
+        goals = pd.DataFrame(goal_rows, columns=['student', 'metric', 'target'])
+        return cls(data, goals)
+
+    def _sum(self, values: np.ndarray) -> np.ndarray:
+        """Per-series sum of an observation-aligned array."""
+        return np.bincount(self._series_id, weights=values, minlength=len(self._starts))
+
+    def _index(self) -> pd.MultiIndex:
+        return pd.MultiIndex.from_frame(self.series[['student', 'metric']])
+
+    @staticmethod
+    def _empty(columns) -> pd.DataFrame:
+        """Result frame for a cohort with no observations, indexed like a non-empty one."""
+        index = pd.MultiIndex.from_arrays([[], []], names=['student', 'metric'])
+        return pd.DataFrame(columns=columns, index=index)
+
+    def get_stats(self) -> pd.DataFrame:
+        """Per-series count, min, max, mean, median, std, last value and trend (see PerformanceTracker.get_stats)."""
+        counts = self._counts
+        if not len(counts):
+            return self._empty(['group', 'count', 'min', 'max', 'mean', 'median', 'std', 'last_value', 'trend'])
+
+        values = self._values
+        ends = self._starts + counts - 1
+        mean = self._sum(values) / counts
+        deviations = values - np.repeat(mean, counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self._sum(deviations ** 2) / (counts - 1))
+        median = pd.Series(values).groupby(self._series_id).median().to_numpy()
+
+        last = values[ends]
+        previous = np.where(counts > 1, values[np.maximum(ends - 1, 0)], last)
+        trend = np.select([last > previous, last < previous], ['increasing', 'decreasing'], 'stable')
+
+        return pd.DataFrame({
+            'group': self.series['group'].to_numpy(),
+            'count': counts,
+            'min': np.minimum.reduceat(values, self._starts),
+            'max': np.maximum.reduceat(values, self._starts),
+            'mean': mean,
+            'median': median,
+            'std': std,
+            'last_value': last,
+            'trend': trend
+        }, index=self._index())
+
+    def analyze_trends(self, window: int = 7) -> pd.DataFrame:
+        """
+        Per-series linear trend over the observation index, as in
+        PerformanceTracker.analyze_trends: slope, R², direction, strength,
+        next value estimate and the trailing rolling average.
+        Series with fewer than two points get NaN slope.
+        """
+        counts = self._counts
+        if not len(counts):
+            return self._empty(['group', 'trend_direction', 'trend_strength', 'slope', 'r_squared',
+                                'next_value_estimate', 'rolling_average', 'data_points'])
+
+        # x is the position of each observation within its series
+        x = np.arange(len(self._values)) - np.repeat(self._starts, counts)
+        y = self._values
+
+        dx = x - np.repeat((counts - 1) / 2.0, counts)
+        dy = y - np.repeat(self._sum(y) / counts, counts)
+        sxx = self._sum(dx * dx)
+        sxy = self._sum(dx * dy)
+        syy = self._sum(dy * dy)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = np.where(counts > 1, sxy / sxx, np.nan)
+            intercept = self._sum(y) / counts - slope * (counts - 1) / 2.0
+            ss_res = syy - slope * sxy
+            r_squared = np.where(syy != 0, 1 - ss_res / syy, 0.0)
+        r_squared = np.where(counts > 1, r_squared, np.nan)
+
+        strength = np.select([np.abs(r_squared) < 0.3, np.abs(r_squared) < 0.7], ['weak', 'moderate'], 'strong')
+        direction = np.select([np.abs(slope) < 0.001, slope > 0], ['stable', 'increasing'], 'decreasing')
+
+        # Mean of the last `window` observations, where the series is long enough
+        in_window = x >= np.repeat(counts - window, counts)
+        rolling = np.where(counts >= window, self._sum(np.where(in_window, y, 0.0)) / window, np.nan)
+
+        return pd.DataFrame({
+            'group': self.series['group'].to_numpy(),
+            'trend_direction': np.where(counts > 1, direction, None),
+            'trend_strength': np.where(counts > 1, strength, None),
+            'slope': slope,
+            'r_squared': r_squared,
+            'next_value_estimate': slope * counts + intercept,
+            'rolling_average': rolling,
+            'data_points': counts
+        }, index=self._index())
+
+    def calculate_progress(self) -> pd.DataFrame:
+        """Progress towards each goal, computed as in PerformanceTracker.calculate_progress."""
+        columns = ['group', 'initial', 'current', 'target', 'progress_percentage', 'remaining']
+        if self.goals is None or not len(self.goals) or not len(self._counts):
+            return self._empty(columns)
+
+        ends = self._starts + self._counts - 1
+        series = self.series.assign(initial=self._values[self._starts], current=self._values[ends])
+        merged = series.merge(self.goals[['student', 'metric', 'target']], on=['student', 'metric'])
+
+        needed = merged['target'] - merged['initial']
+        change = merged['current'] - merged['initial']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentage = change / needed * 100
+        percentage = np.where(needed > 0, np.minimum(percentage, 100.0), np.maximum(percentage, 100.0))
+        reached = np.where(merged['current'] >= merged['target'], 100.0, 0.0)
+        merged['progress_percentage'] = np.where(needed == 0, reached, percentage)
+        merged['remaining'] = merged['target'] - merged['current']
+
+        return merged.set_index(['student', 'metric'])[columns]
+
+    def summarize(self, window: int = 7) -> pd.DataFrame:
+        """
+        Summarize every metric per group (class/grade).
+
+        Returns:
+            DataFrame indexed by (group, metric) with the number of students,
+            the mean of per-student means and slopes, the share of students
+            with an increasing trend and the mean goal progress
+        """
+        stats = self.get_stats()
+        trends = self.analyze_trends(window)
+        table = pd.DataFrame({
+            'group': stats['group'].to_numpy(),
+            'metric': stats.index.get_level_values('metric'),
+            'mean': stats['mean'].to_numpy(),
+            'slope': trends['slope'].to_numpy(),
+            'increasing': (trends['trend_direction'] == 'increasing').to_numpy(),
+            'progress_percentage': self.calculate_progress()['progress_percentage']
+                .reindex(stats.index).to_numpy(dtype=float)
+        })
+
+        return table.groupby(['group', 'metric'], dropna=False).agg(
+            students=('mean', 'size'),
+            mean_value=('mean', 'mean'),
+            mean_slope=('slope', 'mean'),
+            improving_share=('increasing', 'mean'),
+            mean_progress=('progress_percentage', 'mean')
+        )
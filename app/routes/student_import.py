@@ -0,0 +1,375 @@
+# routes/student_import.py
+import csv
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import click
+from flask import Blueprint, request, jsonify
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, Student
+from routes.student_routes import invalidate_students
+
+student_import_bp = Blueprint('student_import', __name__, cli_group='students')
+
+# Rows looked up and written per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+# Characters read at a time from a JSON document
+READ_CHUNK_SIZE = 64 * 1024
+
+# Longest JSON object accepted; a malformed one is reported once its text passes this
+MAX_RECORD_SIZE = 1024 * 1024
+
+# Row errors listed in a report; the counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_MODES = ('insert', 'upsert')
+IMPORT_FIELDS = ('first_name', 'last_name', 'email', 'date_of_birth', 'grade_level', 'teacher_id', 'profile_image')
+REQUIRED_FIELDS = ('first_name', 'last_name', 'email')
+
+# Values for optional columns a new student is created without
+INSERT_DEFAULTS = {'date_of_birth': None, 'grade_level': None, 'teacher_id': None, 'profile_image': 'default.jpg'}
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+Record = Tuple[int, object]
+
+class ImportFormatError(ValueError):
+    """The input cannot be read any further. `report` holds what was imported before that point."""
+    report = None
+
+def detect_format(filename: Optional[str], mimetype: Optional[str]) -> Optional[str]:
+    """'csv' or 'json' from a file name or a content type"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv' or mimetype in ('text/csv', 'application/csv'):
+        return 'csv'
+    if extension in ('.json', '.jsonl', '.ndjson') or mimetype in ('application/json', 'application/x-ndjson'):
+        return 'json'
+    return None
+
+def iter_csv_records(stream: TextIO) -> Iterator[Record]:
+    """Yield (row number, record) from CSV with a header row. Row 1 is the first data row."""
+    reader = csv.DictReader(stream)
+    header = [(name or '').strip().lower() for name in (reader.fieldnames or [])]
+    missing = [field for field in REQUIRED_FIELDS if field not in header]
+    if missing:
+        raise ImportFormatError(f"CSV header is missing: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    number = 0
+    try:
+        for number, record in enumerate(reader, 1):
+            yield number, record
+    except csv.Error as e:
+        raise ImportFormatError(f"Unreadable CSV after row {number}: {e}")
+
+def iter_json_records(stream: TextIO, chunk_size: int = READ_CHUNK_SIZE,
+                      max_record_size: int = MAX_RECORD_SIZE) -> Iterator[Record]:
+    """
+    Yield (item number, record) from a JSON array of objects or from
+    newline-delimited JSON. Objects are decoded one at a time from a small
+    buffer, so the whole document is never held in memory. An object that
+    still does not decode after max_record_size characters is reported as
+    malformed instead of buffering the rest of the document.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, number = '', 0, 0
+    in_array, eof = None, False
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position == len(buffer):
+            if eof:
+                break
+            buffer, position = stream.read(chunk_size), 0
+            eof = not buffer
+            continue
+
+        if in_array is None:
+            in_array = buffer[position] == '['
+            if in_array:
+                position += 1
+                continue
+        if in_array and buffer[position] == ']':
+            break
+
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # The object may just continue in the next chunk
+            if len(buffer) - position > max_record_size:
+                raise ImportFormatError(f"Malformed JSON at item {number + 1} "
+                                        f"(or longer than {max_record_size} characters): {e.msg}")
+            more = '' if eof else stream.read(chunk_size)
+            if not more:
+                raise ImportFormatError(f"Malformed JSON at item {number + 1}: {e.msg}")
+            buffer, position = buffer[position:] + more, 0
+            continue
+
+        number += 1
+        yield number, record
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    if fmt == 'csv':
+        return iter_csv_records(stream)
+    if fmt == 'json':
+        return iter_json_records(stream)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+def _parse_int(value):
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError("must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("must be an integer")
+
+CONVERTERS = {'date_of_birth': _parse_date, 'grade_level': _parse_int, 'teacher_id': _parse_int}
+
+def clean_record(record) -> Tuple[Dict[str, object], List[str]]:
+    """
+    Validate one input record and convert it to column values. Missing or
+    empty optional fields are left out, so an upsert only changes the fields
+    a row provides.
+
+    Returns:
+        (column values, list of error messages)
+    """
+    if not isinstance(record, dict):
+        return {}, ["Row is not an object"]
+
+    values, errors = {}, []
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            if field in REQUIRED_FIELDS:
+                errors.append(f"{field} is required")
+            continue
+
+        try:
+            value = CONVERTERS[field](value) if field in CONVERTERS else str(value)
+        except ValueError as e:
+            errors.append(f"{field}: {e}")
+            continue
+
+        length = getattr(Student.__table__.c[field].type, 'length', None)
+        if length and isinstance(value, str) and len(value) > length:
+            errors.append(f"{field} is longer than {length} characters")
+            continue
+        values[field] = value
+
+    if 'email' in values and not EMAIL_PATTERN.match(values['email']):
+        errors.append("email is not a valid address")
+    return values, errors
+
+def new_report() -> Dict[str, object]:
+    return {'processed': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+def record_error(report, row: int, email: Optional[str], errors: List[str]):
+    report['failed'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'row': row, 'email': email, 'errors': errors})
+    else:
+        report['errors_truncated'] = True
+
+def _finish(dry_run: bool):
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+        invalidate_students()
+
+def _update_statement():
+    table = Student.__table__
+    return update(table).where(table.c.id == bindparam('_id'))
+
+def _write_rows_one_by_one(inserts, updates, report, dry_run):
+    """Slow path after a chunk hit a constraint: write each row in its own savepoint to find the bad ones."""
+    for rows, statement, counter in ((inserts, insert(Student.__table__), 'created'),
+                                     (updates, _update_statement(), 'updated')):
+        for number, values in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(statement, [values])
+                report[counter] += 1
+            except IntegrityError as e:
+                record_error(report, number, values.get('email'), [f"Rejected by the database: {e.orig}"])
+    _finish(dry_run)
+
+def write_chunk(chunk: List[Tuple[int, Dict[str, object]]], mode: str, report, dry_run: bool = False):
+    """
+    Write one chunk of validated rows in a single transaction: one query
+    finds which emails already exist, then new students are inserted and
+    (in upsert mode) existing ones updated with executemany statements.
+    """
+    table = Student.__table__
+    emails = [values['email'] for _, values in chunk]
+    existing = dict(db.session.execute(
+        select(table.c.email, table.c.id).where(table.c.email.in_(emails))
+    ).all())
+
+    inserts, updates = [], []
+    for number, values in chunk:
+        if values['email'] not in existing:
+            inserts.append((number, {**INSERT_DEFAULTS, **values}))
+        elif mode == 'upsert':
+            updates.append((number, {'_id': existing[values['email']], **values}))
+        else:
+            record_error(report, number, values['email'], ["Student with this email already exists"])
+
+    # executemany needs the same columns in every row of a batch
+    update_batches = {}
+    for _, values in updates:
+        update_batches.setdefault(tuple(sorted(values)), []).append(values)
+
+    try:
+        if inserts:
+            db.session.execute(insert(table), [values for _, values in inserts])
+        for batch in update_batches.values():
+            db.session.execute(_update_statement(), batch)
+        _finish(dry_run)
+    except IntegrityError:
+        # Most likely an email taken by another writer since the lookup
+        db.session.rollback()
+        _write_rows_one_by_one(inserts, updates, report, dry_run)
+        return
+
+    report['created'] += len(inserts)
+    report['updated'] += len(updates)
+
+def import_records(records: Iterable[Record], mode: str = 'insert', chunk_size: int = IMPORT_CHUNK_SIZE,
+                   dry_run: bool = False) -> Dict[str, object]:
+    """
+    Validate (row number, record) pairs as they are read and write them in
+    chunks of chunk_size rows, one transaction per chunk. Invalid rows and
+    rows whose email is already taken (insert mode) or repeated in the input
+    are skipped and listed in the report; the rest are imported.
+
+    Args:
+        mode: 'insert' rejects existing emails, 'upsert' updates those students
+        dry_run: Validate and write, but roll every chunk back
+
+    Returns:
+        Report with processed/created/updated/failed counts and per-row errors
+
+    Raises:
+        ImportFormatError: The input stopped being readable. Rows before
+            that point are imported and the exception carries the report.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(IMPORT_MODES)}")
+
+    report = new_report()
+    first_row = {}
+    chunk = []
+    try:
+        for number, record in records:
+            report['processed'] += 1
+            values, errors = clean_record(record)
+            email = values.get('email')
+            if not errors and email in first_row:
+                errors.append(f"email already appears on row {first_row[email]}")
+            if errors:
+                record_error(report, number, email, errors)
+                continue
+
+            first_row[email] = number
+            chunk.append((number, values))
+            if len(chunk) >= chunk_size:
+                write_chunk(chunk, mode, report, dry_run)
+                chunk = []
+    except ImportFormatError as e:
+        if chunk:
+            write_chunk(chunk, mode, report, dry_run)
+        report['errors'].sort(key=lambda error: error['row'])
+        e.report = report
+        raise
+
+    if chunk:
+        write_chunk(chunk, mode, report, dry_run)
+    # Conflicts are found a chunk after validation errors; list both in input order
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+@student_import_bp.route('/api/students/import', methods=['POST'])
+def import_students():
+    """
+    Import a roster in bulk.
+    Body: CSV with a header row, or a JSON array / newline-delimited JSON of
+    student objects; either as the request body or as a multipart `file`.
+    Query: mode (insert | upsert), dry_run, format (csv | json, if the
+    content type or file name does not tell)
+    """
+    mode = request.args.get('mode', 'insert')
+    if mode not in IMPORT_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(IMPORT_MODES)}"}), 400
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload:
+        stream, fmt = upload.stream, detect_format(upload.filename, upload.mimetype)
+    else:
+        stream, fmt = request.stream, detect_format(None, request.mimetype)
+    fmt = request.args.get('format', fmt)
+    if fmt not in ('csv', 'json'):
+        return jsonify({"error": "Send CSV (text/csv) or JSON (application/json), or pass format=csv|json"}), 400
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        report = import_records(iter_records(text, fmt), mode=mode, dry_run=dry_run)
+    except ImportFormatError as e:
+        return jsonify({"error": str(e), **(e.report or new_report())}), 400
+    except UnicodeDecodeError:
+        return jsonify({"error": "The roster must be UTF-8 encoded"}), 400
+    finally:
+        text.detach()
+
+    return jsonify({"dry_run": dry_run, **report})
+
+@student_import_bp.cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), help='Defaults to the file extension')
+@click.option('--mode', type=click.Choice(IMPORT_MODES), default='insert', show_default=True)
+@click.option('--dry-run', is_flag=True, help='Validate and roll back instead of committing')
+@click.option('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, show_default=True)
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write the full report as JSON')
+def import_command(path, fmt, mode, dry_run, chunk_size, report_path):
+    """Import a student roster from a CSV or JSON file."""
+    fmt = fmt or detect_format(path, None)
+    if fmt is None:
+        raise click.UsageError("Cannot tell the format from the file name; pass --format")
+
+    error = None
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        try:
+            report = import_records(iter_records(f, fmt), mode=mode, chunk_size=chunk_size, dry_run=dry_run)
+        except ImportFormatError as e:
+            error, report = str(e), e.report
+
+    click.echo(f"{'Checked' if dry_run else 'Imported'} {path}: {report['processed']} rows, "
+               f"{report['created']} created, {report['updated']} updated, {report['failed']} failed")
+    for row in report['errors'][:20]:
+        click.echo(f"  row {row['row']} ({row['email'] or 'no email'}): {'; '.join(row['errors'])}")
+    if report['failed'] > 20:
+        click.echo(f"  ... {report['failed'] - 20} more")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'error': error, 'dry_run': dry_run, **report}, f, indent=2)
+    if error:
+        click.echo(f"Error: {error}", err=True)
+        sys.exit(1)
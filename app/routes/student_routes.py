@@ -1,11 +1,21 @@
 # At the top of your file, add this import:
 from flask import current_app
 # routes/student_routes.py
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, Response, stream_with_context
+from flask import abort, send_file, session, make_response
 from models import db, Student
 from datetime import datetime
+from functools import partial
+from sqlalchemy import and_, or_, select
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
+from services.image_store import ImageStore
+from services.page_cache import Fragment, PageCache, content_etag
+from services.student_serializer import column_units, iter_json_array, serialize_rows
+import base64
+import json
 import os
+import threading
 
 student_bp = Blueprint('students', __name__)
 
@@ -14,16 +24,250 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
 
+DEFAULT_IMAGE = 'default.jpg'
+
+# Stored images never change under their name, so browsers may keep them for a year
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+_image_store = None
+_image_store_lock = threading.Lock()
+
+def get_image_store():
+    """
+    Return the shared profile image store, creating it on first use
+    Images live in UPLOAD_FOLDER (static/uploads by default)
+    """
+    global _image_store
+    with _image_store_lock:
+        if _image_store is None:
+            root = current_app.config.get('UPLOAD_FOLDER') or os.path.join(current_app.static_folder, 'uploads')
+            _image_store = ImageStore.from_env(root)
+        return _image_store
+
+def referenced_images(app):
+    """Names of the images students still use; runs in the image worker pool"""
+    with app.app_context():
+        names = db.session.execute(select(Student.profile_image).distinct()).scalars()
+        return {name for name in names if name} | {DEFAULT_IMAGE}
+
+def schedule_image_cleanup():
+    """Sweep images no student uses any more, in the background, if a sweep is due"""
+    get_image_store().maybe_collect_garbage(partial(referenced_images, current_app._get_current_object()))
+
+# Rendered roster rows, student pages and API records; cleared whenever a student is written
+page_cache = PageCache.from_env()
+
+ROSTER_KEY = 'students:roster'
+
+def invalidate_students():
+    """Drop cached student output; call after committing any change to students"""
+    page_cache.invalidate()
+
+def student_validators(student):
+    """ETag and Last-Modified of a student, both taken from updated_at"""
+    updated_at = student.updated_at or student.created_at
+    return f"{student.id}-{updated_at.isoformat() if updated_at else ''}", updated_at
+
+def page_etag(etag):
+    """ETag of an HTML page built from content with `etag`; pages also show who is logged in"""
+    return content_etag(f"{etag}:{session.get('_user_id', '')}")
+
+def conditional_response(etag, last_modified, body):
+    """
+    Response for output with the given validators, or a 304 if the client's
+    copy is still current, in which case body() is never called. Clients may
+    keep the output but must revalidate it before reuse.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response(body())
+    else:
+        response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def uncached_page(template, **context):
+    """Render a page that shows pending flash messages; such a page is never cached"""
+    response = make_response(render_template(template, **context))
+    response.cache_control.no_store = True
+    return response
+
+# Listing API settings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Fields a client can select with ?fields=, in the order of Student.to_dict
+STUDENT_FIELDS = ('id', 'first_name', 'last_name', 'email', 'date_of_birth',
+                  'grade_level', 'profile_image', 'created_at', 'updated_at')
+
+# Orders a listing can be paged in; id breaks ties between equal created_at values
+SORT_KEYS = ('id', 'created_at')
+
+def encode_cursor(sort, row):
+    """Opaque cursor pointing just past `row` in `sort` order"""
+    value = row.id if sort == 'id' else row.created_at.isoformat()
+    payload = json.dumps([sort, value, row.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort):
+    """
+    Decode a cursor made by encode_cursor
+    Returns (sort value, id); raises ValueError if it is malformed or was made for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = int(last_id)
+        if cursor_sort == 'created_at':
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort={cursor_sort}")
+    return value, last_id
+
+def parse_fields(args):
+    """Fields selected with ?fields=, all of STUDENT_FIELDS by default"""
+    fields = STUDENT_FIELDS
+    if args.get('fields'):
+        fields = tuple(dict.fromkeys(f.strip() for f in args['fields'].split(',') if f.strip()))
+        unknown = [f for f in fields if f not in STUDENT_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(STUDENT_FIELDS)}")
+    return fields
+
+def parse_filters(args):
+    """Column filters given as ?grade_level= and ?teacher_id="""
+    filters = {}
+    for name in ('grade_level', 'teacher_id'):
+        if args.get(name):
+            try:
+                filters[name] = int(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be an integer")
+    return filters
+
+def parse_list_args(args):
+    """
+    Validate the query string of GET /api/students
+    Returns a dict of options; raises ValueError with a message for the client
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    sort = args.get('sort', 'id')
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    
+    fields = parse_fields(args)
+    filters = parse_filters(args)
+    cursor = decode_cursor(args['cursor'], sort) if args.get('cursor') else None
+    return {'limit': limit, 'sort': sort, 'fields': fields, 'filters': filters, 'cursor': cursor}
+
+def student_select(fields, filters=None, sort='id', cursor=None):
+    """
+    Core select of the given student columns in keyset order. The sort key
+    columns are appended after `fields` when they were not requested.
+    """
+    table = Student.__table__
+    keys = ('id',) if sort == 'id' else ('created_at', 'id')
+    statement = select(*[table.c[name] for name in dict.fromkeys(fields + keys)])
+    
+    for name, value in (filters or {}).items():
+        statement = statement.where(table.c[name] == value)
+    
+    if sort == 'id':
+        if cursor:
+            statement = statement.where(table.c.id > cursor[1])
+        return statement.order_by(table.c.id)
+    
+    # Rows without a creation time have no place in this order; they are listed by id only
+    statement = statement.where(table.c.created_at.isnot(None))
+    if cursor:
+        created_at, last_id = cursor
+        statement = statement.where(or_(table.c.created_at > created_at,
+                                        and_(table.c.created_at == created_at, table.c.id > last_id)))
+    return statement.order_by(table.c.created_at, table.c.id)
+
+def list_students(limit=DEFAULT_PAGE_SIZE, sort='id', fields=STUDENT_FIELDS, filters=None, cursor=None):
+    """
+    Fetch one page of students with a keyset query.
+    
+    Only the selected columns (plus the sort key) are read, and the page
+    starts after the cursor's row instead of at an OFFSET, so the cost of a
+    page does not grow with the table or with how far the client has paged.
+    
+    Returns:
+        (list of student dicts, next cursor or None)
+    """
+    statement = student_select(fields, filters, sort, cursor)
+    
+    # One extra row tells whether there is a next page
+    rows = db.session.execute(statement.limit(limit + 1)).all()
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    units = column_units(statement.selected_columns)[:len(fields)]
+    return serialize_rows(rows[:limit], fields, units), next_cursor
+
 # API Routes
 @student_bp.route('/api/students', methods=['GET'])
 def get_students():
-    students = Student.query.all()
-    return jsonify([student.to_dict() for student in students])
+    """
+    List students one page at a time.
+    Query: limit, sort (id | created_at), fields (comma separated), grade_level,
+    teacher_id, cursor (from the previous page's X-Next-Cursor header)
+    """
+    try:
+        options = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    students, next_cursor = list_students(**options)
+    response = jsonify(students)
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("students.get_students", _external=True, **args)}>; rel="next"'
+    return response
+
+@student_bp.route('/api/students/export', methods=['GET'])
+def export_students():
+    """
+    Stream every matching student as one JSON array, in id order.
+    Query: fields (comma separated), grade_level, teacher_id
+    """
+    try:
+        fields = parse_fields(request.args)
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    statement = student_select(fields, filters).with_only_columns(
+        *[Student.__table__.c[name] for name in fields])
+    return Response(
+        stream_with_context(iter_json_array(db.engine, statement)),
+        mimetype='application/json'
+    )
 
 @student_bp.route('/api/students/<int:id>', methods=['GET'])
 def get_student(id):
-    student = Student.query.get_or_404(id)
-    return jsonify(student.to_dict())
+    def build():
+        student = Student.query.get_or_404(id)
+        etag, last_modified = student_validators(student)
+        return Fragment(current_app.json.dumps(student.to_dict()), etag, last_modified)
+    
+    record = page_cache.get_or_build(f'students:api:{id}', build)
+    return conditional_response(
+        record.etag, record.last_modified,
+        lambda: current_app.response_class(record.content + '\n', mimetype='application/json')
+    )
 
 @student_bp.route('/api/students', methods=['POST'])
 def create_student():
@@ -60,6 +304,7 @@ def create_student():
     
     db.session.add(student)
     db.session.commit()
+    invalidate_students()
     
     return jsonify(student.to_dict()), 201
 
@@ -88,6 +333,7 @@ def update_student(id):
         student.grade_level = data['grade_level']
     
     db.session.commit()
+    invalidate_students()
     
     return jsonify(student.to_dict())
 
@@ -97,14 +343,60 @@ def delete_student(id):
     
     db.session.delete(student)
     db.session.commit()
+    invalidate_students()
+    schedule_image_cleanup()
     
     return jsonify({"message": "Student deleted successfully"})
 
+@student_bp.route('/students/images/<size>/<name>')
+def profile_image(size, name):
+    """
+    Serve a profile image: size is 'original' or a thumbnail size (small, medium).
+    Stored images are immutable, so they get a long-lived Cache-Control and
+    an ETag that lets revalidation end in 304 Not Modified.
+    """
+    store = get_image_store()
+    if size != 'original' and size not in store.sizes:
+        abort(404)
+    
+    if not store.is_stored_name(name):
+        # The default image and uploads saved under their own names can be replaced in place
+        path = store.path(secure_filename(name))
+        if not os.path.isfile(path):
+            abort(404)
+        return send_file(path, conditional=True)
+    
+    original = store.path(name)
+    if not os.path.isfile(original):
+        abort(404)
+    path = original if size == 'original' else store.thumbnail(name, size)
+    if path is None:
+        # The thumbnail is still being made: send the original, but not for keeps
+        response = send_file(original, conditional=True, etag=False)
+        response.cache_control.no_cache = True
+        return response
+    
+    response = send_file(path, conditional=True, etag=f"{name}-{size}", max_age=IMAGE_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
 # Web Routes
+def build_roster_rows():
+    """The roster table rows, rendered once per change to students"""
+    students = Student.query.all()
+    html = render_template('students/_rows.html', students=students) if students else ''
+    return Fragment(html, content_etag(html), None)
+
 @student_bp.route('/students')
 def student_list():
-    students = Student.query.all()
-    return render_template('students/index.html', students=students)
+    rows = page_cache.get_or_build(ROSTER_KEY, build_roster_rows)
+    if session.get('_flashes'):
+        return uncached_page('students/index.html', student_rows=rows.content)
+    # ETag only: deleting a student changes the roster without moving any updated_at
+    return conditional_response(
+        page_etag(rows.etag), None,
+        lambda: render_template('students/index.html', student_rows=rows.content)
+    )
 
 @student_bp.route('/students/new', methods=['GET', 'POST'])
 def new_student():
@@ -135,15 +427,12 @@ def new_student():
                 flash('Invalid date format. Use YYYY-MM-DD', 'danger')
                 return render_template('students/new.html')
         
-        # Handle file upload
-        profile_image = 'default.jpg'
+        # Handle file upload; thumbnails are made in the background
+        profile_image = DEFAULT_IMAGE
         if 'profile_image' in request.files:
             file = request.files['profile_image']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                profile_image = filename
+                profile_image = get_image_store().save(file.stream, file.filename)
         
         # Create new student
         grade_level = request.form.get('grade_level')
@@ -164,6 +453,7 @@ def new_student():
         
         db.session.add(student)
         db.session.commit()
+        invalidate_students()
         
         flash('Student created successfully', 'success')
         return redirect(url_for('students.student_list'))
@@ -172,8 +462,16 @@ def new_student():
 
 @student_bp.route('/students/<int:id>')
 def view_student(id):
-    student = Student.query.get_or_404(id)
-    return render_template('students/view.html', student=student)
+    if session.get('_flashes'):
+        return uncached_page('students/view.html', student=Student.query.get_or_404(id))
+    
+    def build():
+        student = Student.query.get_or_404(id)
+        etag, last_modified = student_validators(student)
+        return Fragment(render_template('students/view.html', student=student), page_etag(etag), last_modified)
+    
+    page = page_cache.get_or_build(f"students:page:{id}:{session.get('_user_id', '')}", build)
+    return conditional_response(page.etag, page.last_modified, lambda: page.content)
 
 @student_bp.route('/students/<int:id>/edit', methods=['GET', 'POST'])
 def edit_student(id):
@@ -210,23 +508,12 @@ def edit_student(id):
                 flash('Invalid date format. Use YYYY-MM-DD', 'danger')
                 return render_template('students/edit.html', student=student)
         
-        # Handle file upload
+        # Handle file upload; the old image is left to the background sweep,
+        # since other students may share it
         if 'profile_image' in request.files:
             file = request.files['profile_image']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                # Remove old file if not default
-                if student.profile_image != 'default.jpg':
-                    try:
-                        old_file = os.path.join(current_app.config['UPLOAD_FOLDER'], student.profile_image)
-                        if os.path.exists(old_file):
-                            os.remove(old_file)
-                    except Exception as e:
-                        # Log error but continue
-                        print(f"Error removing old file: {e}")
-                student.profile_image = filename
+                student.profile_image = get_image_store().save(file.stream, file.filename)
         
         # Update grade level
         grade_level = request.form.get('grade_level')
@@ -237,6 +524,8 @@ def edit_student(id):
                 student.grade_level = None
         
         db.session.commit()
+        invalidate_students()
+        schedule_image_cleanup()
         
         flash('Student updated successfully', 'success')
         return redirect(url_for('students.view_student', id=student.id))
@@ -249,6 +538,8 @@ def delete_student_ui(id):
     
     db.session.delete(student)
     db.session.commit()
+    invalidate_students()
+    schedule_image_cleanup()
     
     flash('Student deleted successfully', 'success')
     return redirect(url_for('students.student_list'))
\ No newline at end of file
@@ -0,0 +1,167 @@
+# ai_providers.py
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+
+# Providers take ChatCompletion keyword arguments (model, messages, max_tokens,
+# temperature, stream) and return responses shaped like the OpenAI API:
+# response["choices"][0]["message"]["content"] for completions and
+# chunk["choices"][0]["delta"].get("content") for streamed chunks.
+
+
+class OpenAIProvider:
+    """
+    Calls the OpenAI ChatCompletion API
+    """
+    name = "openai"
+
+    def __init__(self, api_key=None):
+        import openai
+        self._openai = openai
+        openai.api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def create(self, **params):
+        return self._openai.ChatCompletion.create(**params)
+
+    async def acreate(self, session=None, **params):
+        if session is not None:
+            # openai reads the session from a context variable, which is per task
+            self._openai.aiosession.set(session)
+        return await self._openai.ChatCompletion.acreate(**params)
+
+
+class StubProviderError(Exception):
+    """Simulated upstream failure raised by StubProvider."""
+
+
+class StubProvider:
+    """
+    Local deterministic stand-in for the API, for offline load testing and
+    benchmarks. Replies depend only on the messages, and latency, token rate
+    and error rate are configurable.
+    """
+    name = "stub"
+
+    def __init__(self, latency=0.2, tokens_per_second=50.0, error_rate=0.0,
+                 reply_tokens=120, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.reply_tokens = reply_tokens
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv("AI_STUB_SEED")
+        return cls(
+            latency=float(os.getenv("AI_STUB_LATENCY", "0.2")),
+            tokens_per_second=float(os.getenv("AI_STUB_TOKENS_PER_SECOND", "50")),
+            error_rate=float(os.getenv("AI_STUB_ERROR_RATE", "0")),
+            reply_tokens=int(os.getenv("AI_STUB_REPLY_TOKENS", "120")),
+            seed=int(seed) if seed is not None else None
+        )
+
+    def _should_fail(self):
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def _reply_tokens(self, messages, max_tokens):
+        """
+        Build the reply as a list of tokens (words with their leading space)
+        """
+        prompt = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha256(repr(messages).encode("utf-8")).hexdigest()
+        words = f"Stub response {digest[:8]} to: {prompt}".split()
+        count = min(self.reply_tokens, max_tokens or self.reply_tokens)
+        while len(words) < count:
+            words.extend(digest[i:i + 4] for i in range(0, len(digest), 4))
+        return [word if i == 0 else " " + word for i, word in enumerate(words[:count])]
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _completion(self, params, tokens):
+        prompt_tokens = sum(len(m.get("content", "")) // 4 + 4 for m in params.get("messages", []))
+        return {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "model": params.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens)
+            }
+        }
+
+    @staticmethod
+    def _chunk(text=None, finish_reason=None):
+        delta = {"content": text} if text is not None else {}
+        return {
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+
+    def create(self, stream=False, **params):
+        tokens = self._reply_tokens(params.get("messages", []), params.get("max_tokens"))
+        if stream:
+            return self._stream(tokens)
+
+        time.sleep(self.latency + len(tokens) * self._token_delay())
+        if self._should_fail():
+            raise StubProviderError("Simulated upstream error")
+        return self._completion(params, tokens)
+
+    def _stream(self, tokens):
+        time.sleep(self.latency)
+        if self._should_fail():
+            raise StubProviderError("Simulated upstream error")
+        delay = self._token_delay()
+        for token in tokens:
+            time.sleep(delay)
+            yield self._chunk(token)
+        yield self._chunk(finish_reason="stop")
+
+    async def acreate(self, session=None, stream=False, **params):
+        tokens = self._reply_tokens(params.get("messages", []), params.get("max_tokens"))
+        if stream:
+            return self._astream(tokens)
+
+        await asyncio.sleep(self.latency + len(tokens) * self._token_delay())
+        if self._should_fail():
+            raise StubProviderError("Simulated upstream error")
+        return self._completion(params, tokens)
+
+    async def _astream(self, tokens):
+        await asyncio.sleep(self.latency)
+        if self._should_fail():
+            raise StubProviderError("Simulated upstream error")
+        delay = self._token_delay()
+        for token in tokens:
+            await asyncio.sleep(delay)
+            yield self._chunk(token)
+        yield self._chunk(finish_reason="stop")
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "stub": StubProvider.from_env
+}
+
+
+def get_provider(name=None):
+    """
+    Create the provider selected by name or the AI_PROVIDER environment variable
+    """
+    name = (name or os.getenv("AI_PROVIDER", "openai")).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown AI provider: {name}")
+    return PROVIDERS[name]()
@@ -1,39 +1,151 @@
 # ai_service.py
 import os
-import openai
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from services.ai_providers import get_provider
+from services.conversation_store import ConversationStore, build_context_window, message_tokens
+from services.job_queue import JobQueue
+from services.rate_limiter import RateLimiter
+from services.response_cache import ResponseCache, make_cache_key
+from services.single_flight import SingleFlight, make_request_key
 
 load_dotenv()  # Load environment variables from .env file
 
-# Configure OpenAI API
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Backend that serves completions, selected by AI_PROVIDER ("openai" or "stub")
+provider = get_provider()
+
+# Shared cache for generated content (None when AI_CACHE_BACKEND=none)
+response_cache = ResponseCache.from_env()
+
+# Identical requests in flight at the same time share one upstream call
+request_flight = SingleFlight()
+
+MODEL = os.getenv("AI_MODEL", "gpt-3.5-turbo")
+CHAT_MAX_TOKENS = 500
+CONTENT_MAX_TOKENS = 800
+TEMPERATURE = 0.7
+
+# Upstream calls a single batch may run in parallel
+BATCH_MAX_WORKERS = int(os.getenv("AI_BATCH_MAX_WORKERS", "8"))
+
+# Prompt tokens allowed for context plus the new message (gpt-3.5-turbo has a 4k window)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "3000"))
+
+_conversation_store = None
+_conversation_store_lock = threading.Lock()
+
+def get_conversation_store():
+    """
+    Return the shared conversation store, opening it on first use
+    """
+    global _conversation_store
+    with _conversation_store_lock:
+        if _conversation_store is None:
+            _conversation_store = ConversationStore.from_env()
+        return _conversation_store
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Return the shared per-user rate limiter, creating it on first use
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter.from_env()
+        return _rate_limiter
+
+def build_chat_messages(prompt, context=None):
+    """
+    Build the message list for a chat request without mutating the caller's context
+    Older context that doesn't fit in CONTEXT_TOKEN_BUDGET is summarized or dropped
+    """
+    prompt_message = {"role": "user", "content": prompt}
+
+    messages = []
+    if context:
+        # Add as much previous conversation context as the token budget allows
+        budget = max(CONTEXT_TOKEN_BUDGET - message_tokens(prompt_message), 0)
+        messages = build_context_window(context, budget)
+
+    # Add the current prompt
+    messages.append(prompt_message)
+    return messages
+
+def get_system_message(content_type="text"):
+    """
+    Return the system message for a content type
+    content_type options: "text", "quiz", "explanation", "summary"
+    """
+    if content_type == "quiz":
+        return "Create a quiz with 5 multiple-choice questions based on the following topic:"
+    elif content_type == "explanation":
+        return "Provide a detailed explanation of the following concept for students:"
+    elif content_type == "summary":
+        return "Create a concise summary of the following educational content:"
+    return "You are an educational assistant."
+
+def parse_batch_item(item):
+    """
+    Return (prompt, content_type) for one batch item: a prompt string, a
+    {"prompt": ..., "content_type": ...} dict or a (prompt, content_type) pair
+    Raises ValueError for anything else
+    """
+    if isinstance(item, str):
+        prompt, content_type = item, "text"
+    elif isinstance(item, dict):
+        prompt, content_type = item.get("prompt"), item.get("content_type", "text")
+    elif isinstance(item, (list, tuple)) and 1 <= len(item) <= 2:
+        prompt, content_type = item[0], (item[1] if len(item) > 1 else "text")
+    else:
+        raise ValueError("Item must be a prompt string, an object or a [prompt, content_type] pair")
+
+    if not isinstance(prompt, str) or not prompt:
+        raise ValueError("Prompt is required")
+    if not isinstance(content_type, str):
+        raise ValueError("content_type must be a string")
+    return prompt, content_type
+
+def _iter_stream_deltas(stream):
+    """
+    Yield the text deltas of a streamed ChatCompletion
+    """
+    for chunk in stream:
+        text = chunk["choices"][0]["delta"].get("content")
+        if text:
+            yield text
 
 class AIService:
+    @staticmethod
+    def create_completion(messages, max_tokens, temperature=TEMPERATURE):
+        """
+        Call the configured provider, sharing one upstream call between
+        concurrent identical requests
+        """
+        key = make_request_key(messages, MODEL, max_tokens=max_tokens, temperature=temperature)
+        return request_flight.do(key, lambda: provider.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ))
+
     @staticmethod
     def generate_chat_response(prompt, context=None):
         """
         Generate a response using OpenAI's chat API
         """
         try:
-            messages = []
-            if context:
-                # Add previous conversation context if available
-                for message in context:
-                    messages.append(message)
-            
-            # Add the current prompt
-            messages.append({"role": "user", "content": prompt})
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
-            )
-            
+            messages = build_chat_messages(prompt, context)
+
+            response = AIService.create_completion(messages, CHAT_MAX_TOKENS)
+
             return {
                 "status": "success",
-                "response": response.choices[0].message.content,
+                "response": response["choices"][0]["message"]["content"],
                 "full_response": response
             }
         except Exception as e:
@@ -41,39 +153,207 @@ class AIService:
                 "status": "error",
                 "error": str(e)
             }
-    
+
     @staticmethod
-    def generate_content(prompt, content_type="text"):
+    def stream_chat_response(prompt, context=None):
+        """
+        Stream a chat response as a generator of text deltas
+        Exceptions from the API are raised to the caller
+        """
+        messages = build_chat_messages(prompt, context)
+
+        stream = provider.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=CHAT_MAX_TOKENS,
+            temperature=TEMPERATURE,
+            stream=True
+        )
+
+        for text in _iter_stream_deltas(stream):
+            yield text
+
+    @staticmethod
+    def generate_content(prompt, content_type="text", use_cache=True):
         """
         Generate content based on the prompt and content type
         content_type options: "text", "quiz", "explanation", "summary"
+        Identical requests are served from the response cache when enabled
         """
         try:
-            system_message = "You are an educational assistant."
-            
-            if content_type == "quiz":
-                system_message = "Create a quiz with 5 multiple-choice questions based on the following topic:"
-            elif content_type == "explanation":
-                system_message = "Provide a detailed explanation of the following concept for students:"
-            elif content_type == "summary":
-                system_message = "Create a concise summary of the following educational content:"
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            system_message = get_system_message(content_type)
+
+            cache_key = None
+            if use_cache and response_cache is not None:
+                cache_key = make_cache_key(system_message, prompt, MODEL, CONTENT_MAX_TOKENS, TEMPERATURE)
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    return {
+                        "status": "success",
+                        "content": cached,
+                        "cached": True
+                    }
+
+            response = AIService.create_completion(
+                [
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=800,
-                temperature=0.7
+                CONTENT_MAX_TOKENS
             )
-            
+
+            content = response["choices"][0]["message"]["content"]
+            if cache_key is not None:
+                response_cache.set(cache_key, content)
+
             return {
                 "status": "success",
-                "content": response.choices[0].message.content
+                "content": content,
+                "cached": False
             }
         except Exception as e:
             return {
                 "status": "error",
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    def generate_content_batch(items, max_workers=None, use_cache=True):
+        """
+        Generate content for many (prompt, content_type) items with bounded parallelism
+        items: list of prompt strings, {"prompt": ..., "content_type": ...} dicts
+        or (prompt, content_type) tuples; see parse_batch_item
+        Yields one result per item in completion order, cache hits first; each
+        result carries the item's index and its own status, so a failed item
+        doesn't abort the batch
+        """
+        pending = []
+        for index, item in enumerate(items):
+            try:
+                prompt, content_type = parse_batch_item(item)
+            except ValueError as e:
+                yield {"index": index, "status": "error", "error": str(e)}
+                continue
+
+            system_message = get_system_message(content_type)
+            cache_key = None
+            if use_cache and response_cache is not None:
+                cache_key = make_cache_key(system_message, prompt, MODEL, CONTENT_MAX_TOKENS, TEMPERATURE)
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    yield {"index": index, "status": "success", "content": cached, "cached": True}
+                    continue
+
+            pending.append((index, system_message, prompt, cache_key))
+
+        if not pending:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers or BATCH_MAX_WORKERS, len(pending)))
+        try:
+            futures = {
+                executor.submit(
+                    AIService.create_completion,
+                    [
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    CONTENT_MAX_TOKENS
+                ): (index, cache_key)
+                for index, system_message, prompt, cache_key in pending
+            }
+
+            for future in as_completed(futures):
+                index, cache_key = futures[future]
+                try:
+                    content = future.result()["choices"][0]["message"]["content"]
+                except Exception as e:
+                    yield {"index": index, "status": "error", "error": str(e)}
+                    continue
+
+                if cache_key is not None:
+                    response_cache.set(cache_key, content)
+                yield {"index": index, "status": "success", "content": content, "cached": False}
+        finally:
+            # Drop queued items if the consumer stops early (e.g. client disconnect)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def stream_content(prompt, content_type="text", use_cache=True):
+        """
+        Stream generated content as a generator of text deltas
+        A cache hit is yielded as a single chunk; a fully streamed reply is cached
+        Exceptions from the API are raised to the caller
+        """
+        system_message = get_system_message(content_type)
+
+        cache_key = None
+        if use_cache and response_cache is not None:
+            cache_key = make_cache_key(system_message, prompt, MODEL, CONTENT_MAX_TOKENS, TEMPERATURE)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        stream = provider.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=CONTENT_MAX_TOKENS,
+            temperature=TEMPERATURE,
+            stream=True
+        )
+
+        # Only keep the parts when the finished reply will be cached
+        parts = [] if cache_key is not None else None
+        for text in _iter_stream_deltas(stream):
+            if parts is not None:
+                parts.append(text)
+            yield text
+
+        if parts is not None:
+            response_cache.set(cache_key, "".join(parts))
+
+    @staticmethod
+    def cache_stats():
+        """
+        Return hit/miss counters for the generated content cache
+        """
+        if response_cache is None:
+            return {"backend": None, "entries": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+        return response_cache.stats()
+
+    @staticmethod
+    def coalescing_stats():
+        """
+        Return how many upstream calls were made and how many were collapsed into them
+        """
+        return request_flight.stats()
+
+def _chat_job(prompt, context=None):
+    response = AIService.generate_chat_response(prompt, context)
+    # The raw API object isn't JSON-serializable
+    response.pop("full_response", None)
+    return response
+
+def _generate_job(prompt, content_type="text"):
+    return AIService.generate_content(prompt, content_type)
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """
+    Return the shared background job queue, starting it on first use
+    Jobs abandoned by a stopped process are picked up again
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue.from_env()
+            _job_queue.register("chat", _chat_job)
+            _job_queue.register("generate", _generate_job)
+            _job_queue.start()
+        return _job_queue
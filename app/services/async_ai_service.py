@@ -0,0 +1,248 @@
+# async_ai_service.py
+import asyncio
+import os
+import threading
+
+import aiohttp
+
+from services.ai_service import (
+    MODEL, CHAT_MAX_TOKENS, CONTENT_MAX_TOKENS, TEMPERATURE,
+    build_chat_messages, get_system_message, provider, response_cache
+)
+from services.response_cache import make_cache_key
+from services.single_flight import AsyncSingleFlight, make_request_key
+
+async def _anext(agen):
+    return await agen.__anext__()
+
+class AsyncAIService:
+    """
+    Asyncio counterpart of AIService.
+
+    All upstream calls run on one background event loop that owns a shared
+    aiohttp session, so a process can keep many chats in flight while the
+    number of concurrent upstream requests stays bounded by a semaphore.
+    Coroutines can be awaited directly from async code, or driven from
+    synchronous Flask views with run() and iter_stream().
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_concurrency=None, timeout=None):
+        self.max_concurrency = max_concurrency or int(os.getenv("AI_MAX_CONCURRENCY", "64"))
+        self.timeout = timeout or float(os.getenv("AI_REQUEST_TIMEOUT", "60"))
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ai-event-loop", daemon=True)
+        self._thread.start()
+
+        self._session = None
+        self._semaphore = None
+        self.flight = AsyncSingleFlight()
+        asyncio.run_coroutine_threadsafe(self._setup(), self.loop).result()
+
+    @classmethod
+    def instance(cls):
+        """Return the process-wide service, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    async def _setup(self):
+        # Both objects must be created on the loop that will use them
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+        )
+
+    async def _create(self, **params):
+        # Concurrent identical requests share one upstream call
+        key = make_request_key(params["messages"], params["model"],
+                               max_tokens=params["max_tokens"], temperature=params["temperature"])
+        return await self.flight.do(key, lambda: self._acreate(**params))
+
+    async def _acreate(self, **params):
+        async with self._semaphore:
+            return await provider.acreate(session=self._session, **params)
+
+    async def generate_chat_response(self, prompt, context=None, timeout=None):
+        """
+        Generate a response using OpenAI's chat API
+        """
+        try:
+            response = await asyncio.wait_for(
+                self._create(
+                    model=MODEL,
+                    messages=build_chat_messages(prompt, context),
+                    max_tokens=CHAT_MAX_TOKENS,
+                    temperature=TEMPERATURE
+                ),
+                timeout or self.timeout
+            )
+
+            return {
+                "status": "success",
+                "response": response["choices"][0]["message"]["content"],
+                "full_response": response
+            }
+        except asyncio.TimeoutError:
+            return {
+                "status": "error",
+                "error": "AI request timed out"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def generate_content(self, prompt, content_type="text", use_cache=True, timeout=None):
+        """
+        Generate content based on the prompt and content type
+        content_type options: "text", "quiz", "explanation", "summary"
+        """
+        try:
+            system_message = get_system_message(content_type)
+            # The cache backend may be SQLite; keep its blocking calls off the shared loop
+            loop = asyncio.get_running_loop()
+
+            cache_key = None
+            if use_cache and response_cache is not None:
+                cache_key = make_cache_key(system_message, prompt, MODEL, CONTENT_MAX_TOKENS, TEMPERATURE)
+                cached = await loop.run_in_executor(None, response_cache.get, cache_key)
+                if cached is not None:
+                    return {
+                        "status": "success",
+                        "content": cached,
+                        "cached": True
+                    }
+
+            response = await asyncio.wait_for(
+                self._create(
+                    model=MODEL,
+                    messages=[
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=CONTENT_MAX_TOKENS,
+                    temperature=TEMPERATURE
+                ),
+                timeout or self.timeout
+            )
+
+            content = response["choices"][0]["message"]["content"]
+            if cache_key is not None:
+                await loop.run_in_executor(None, response_cache.set, cache_key, content)
+
+            return {
+                "status": "success",
+                "content": content,
+                "cached": False
+            }
+        except asyncio.TimeoutError:
+            return {
+                "status": "error",
+                "error": "AI request timed out"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def stream_chat_response(self, prompt, context=None):
+        """
+        Stream a chat response as an async generator of text deltas
+        The semaphore slot is held until the stream finishes or is closed
+        """
+        async with self._semaphore:
+            stream = await provider.acreate(
+                session=self._session,
+                model=MODEL,
+                messages=build_chat_messages(prompt, context),
+                max_tokens=CHAT_MAX_TOKENS,
+                temperature=TEMPERATURE,
+                stream=True
+            )
+            async for chunk in stream:
+                text = chunk["choices"][0]["delta"].get("content")
+                if text:
+                    yield text
+
+    async def stream_content(self, prompt, content_type="text", use_cache=True):
+        """
+        Stream generated content as an async generator of text deltas
+        A cache hit is yielded as a single chunk; a fully streamed reply is cached
+        The semaphore slot is held until the stream finishes or is closed
+        """
+        system_message = get_system_message(content_type)
+        loop = asyncio.get_running_loop()
+
+        cache_key = None
+        if use_cache and response_cache is not None:
+            cache_key = make_cache_key(system_message, prompt, MODEL, CONTENT_MAX_TOKENS, TEMPERATURE)
+            cached = await loop.run_in_executor(None, response_cache.get, cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        # Only keep the parts when the finished reply will be cached
+        parts = [] if cache_key is not None else None
+        async with self._semaphore:
+            stream = await provider.acreate(
+                session=self._session,
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=CONTENT_MAX_TOKENS,
+                temperature=TEMPERATURE,
+                stream=True
+            )
+            async for chunk in stream:
+                text = chunk["choices"][0]["delta"].get("content")
+                if text:
+                    if parts is not None:
+                        parts.append(text)
+                    yield text
+
+        if parts is not None:
+            await loop.run_in_executor(None, response_cache.set, cache_key, "".join(parts))
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the service loop and wait for its result.
+        The coroutine is cancelled if the deadline passes first or the
+        waiting thread is interrupted.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iter_stream(self, agen, timeout=None):
+        """
+        Drive an async generator from synchronous code.
+        timeout bounds the wait for each chunk. Closing this generator (for
+        example when the HTTP client disconnects and the WSGI server closes
+        the response) cancels the upstream stream.
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(_anext(agen), timeout or self.timeout)
+                except StopAsyncIteration:
+                    break
+        finally:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), self.loop)
+
+    def close(self):
+        """Close the shared HTTP session and stop the event loop."""
+        asyncio.run_coroutine_threadsafe(self._session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
@@ -0,0 +1,146 @@
+# chart_service.py
+import hashlib
+import io
+import json
+import os
+from datetime import date
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from services.response_cache import MemoryCacheBackend
+from services.single_flight import SingleFlight
+
+MIMETYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml"
+}
+
+
+def make_chart_key(name, version, kind, metrics, last_n_days, show_goal, fmt):
+    """
+    Build a content address for a chart: the tracker's name and data version
+    plus everything that changes the rendered image. Windowed charts also
+    depend on today's date, since the window ends today.
+    """
+    payload = json.dumps(
+        [name, version, kind, metrics, last_n_days, show_goal, fmt,
+         date.today().isoformat() if last_n_days else None],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def metric_chart_key(name, version, metric, show_goal=True, last_n_days=None, fmt="png"):
+    """Cache key of ChartService.render_metric for a tracker at the given version"""
+    return make_chart_key(name, version, "metric", [metric], last_n_days, show_goal, fmt)
+
+
+def dashboard_chart_key(name, version, metrics=None, last_n_days=30, fmt="png"):
+    """
+    Cache key of ChartService.render_dashboard for a tracker at the given
+    version. It names the metrics as requested (None for all of them); the
+    version fixes which of those the tracker has.
+    """
+    return make_chart_key(name, version, "dashboard", list(metrics) if metrics else None, last_n_days, True, fmt)
+
+
+class ChartService:
+    """
+    Renders PerformanceTracker charts to PNG/SVG bytes and caches the result.
+
+    Figures are created with matplotlib.figure.Figure on the Agg canvas
+    rather than through pyplot, so nothing is registered with pyplot's global
+    figure manager and each figure is freed once rendered. The tracker's
+    version changes on every record_data/set_goal, so a cached image is only
+    reused while the data it was drawn from is unchanged.
+    """
+
+    def __init__(self, max_entries=256, dpi=100):
+        self.dpi = dpi
+        self._cache = MemoryCacheBackend(max_entries)
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entries=int(os.getenv("CHART_CACHE_MAX_ENTRIES", "256")),
+            dpi=int(os.getenv("CHART_DPI", "100"))
+        )
+
+    def _render(self, fig, fmt):
+        if fmt not in MIMETYPES:
+            raise ValueError(f"Unsupported chart format: {fmt}")
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=self.dpi)
+        return buffer.getvalue()
+
+    def cached(self, key):
+        """Return the cached image for key, or None without rendering anything"""
+        image = self._cache.get(key)
+        if image is not None:
+            self.hits += 1
+        return image
+
+    def _cached(self, key, draw, fmt):
+        image = self.cached(key)
+        if image is not None:
+            return image
+
+        def render():
+            fig = Figure()
+            FigureCanvasAgg(fig)
+            draw(fig)
+            image = self._render(fig, fmt)
+            self._cache.set(key, image)
+            return image
+
+        # Concurrent requests for the same uncached chart render it once
+        self.misses += 1
+        return self._flight.do(key, render)
+
+    def render_metric(self, tracker, metric, show_goal=True, last_n_days=None, fmt="png", name=None):
+        """
+        Render tracker.plot_metric for one metric, cached under `name`
+        (tracker.name by default)
+        Returns (image bytes, cache key); the key can be used as an ETag
+        """
+        key = metric_chart_key(name or tracker.name, tracker.version, metric, show_goal, last_n_days, fmt)
+
+        def draw(fig):
+            fig.set_size_inches(10, 6)
+            tracker.plot_metric(metric, show_goal=show_goal, last_n_days=last_n_days, ax=fig.subplots())
+            fig.tight_layout()
+
+        return self._cached(key, draw, fmt), key
+
+    def render_dashboard(self, tracker, metrics=None, last_n_days=30, fmt="png", name=None):
+        """
+        Render tracker.plot_dashboard, cached under `name` (tracker.name by
+        default). Requested metrics the tracker does not have are skipped.
+        Returns (image bytes, cache key); the key can be used as an ETag
+        Raises ValueError if none of the metrics exist
+        """
+        selected = [m for m in (metrics or tracker.metrics) if m in tracker.metrics]
+        if not selected:
+            raise ValueError("No valid metrics")
+        key = dashboard_chart_key(name or tracker.name, tracker.version, metrics, last_n_days, fmt)
+
+        def draw(fig):
+            tracker.plot_dashboard(selected, last_n_days=last_n_days, fig=fig)
+
+        return self._cached(key, draw, fmt), key
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,198 @@
+# conversation_store.py
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+# Tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of a string locally
+    Uses tiktoken when installed, otherwise ~4 characters per token
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message):
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def build_context_window(messages, token_budget, summary_budget=None):
+    """
+    Return the most recent messages that fit within token_budget.
+    Older turns that don't fit are replaced by a short summary message built
+    from the questions that were asked, when it fits in summary_budget.
+    """
+    if summary_budget is None:
+        summary_budget = token_budget // 8
+
+    used = 0
+    index = len(messages)
+    while index > 0:
+        tokens = message_tokens(messages[index - 1])
+        if used + tokens > token_budget:
+            break
+        used += tokens
+        index -= 1
+    window = list(messages[index:])
+
+    dropped = messages[:index]
+    if dropped and summary_budget > 0:
+        summary = summarize_turns(dropped, min(summary_budget, token_budget - used))
+        if summary:
+            window.insert(0, summary)
+
+    return window
+
+
+def summarize_turns(messages, token_budget):
+    """
+    Build a compact system message listing earlier user questions, keeping
+    the most recent ones that fit in token_budget. Returns None if none fit.
+    """
+    prefix = "Summary of earlier conversation. The student previously asked about: "
+    budget = token_budget - MESSAGE_OVERHEAD_TOKENS - estimate_tokens(prefix)
+    topics = []
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        topic = " ".join(message.get("content", "").split())[:120]
+        cost = estimate_tokens(topic) + 1
+        if cost > budget:
+            break
+        topics.append(topic)
+        budget -= cost
+
+    if not topics:
+        return None
+    return {"role": "system", "content": prefix + "; ".join(reversed(topics))}
+
+
+class ConversationStore:
+    """
+    Server-side chat history: an in-memory LRU of recent conversations in
+    front of a SQLite table holding every message
+    """
+
+    def __init__(self, path="conversations.db", max_cached=256):
+        self.path = path
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_messages ("
+            " conversation_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " role TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (conversation_id, seq))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.getenv("AI_CONVERSATION_DB", "conversations.db"),
+            max_cached=int(os.getenv("AI_CONVERSATION_CACHE_SIZE", "256"))
+        )
+
+    def _remember(self, conversation_id, messages):
+        self._cache[conversation_id] = messages
+        self._cache.move_to_end(conversation_id)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def create(self):
+        conversation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?)",
+                (conversation_id, now, now)
+            )
+            self._conn.commit()
+            self._remember(conversation_id, [])
+        return conversation_id
+
+    def get_messages(self, conversation_id):
+        """
+        Return a copy of the conversation's messages, or None if it doesn't exist
+        """
+        with self._lock:
+            messages = self._cache.get(conversation_id)
+            if messages is not None:
+                self._cache.move_to_end(conversation_id)
+                return list(messages)
+
+            if self._conn.execute(
+                "SELECT 1 FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone() is None:
+                return None
+
+            rows = self._conn.execute(
+                "SELECT role, content FROM conversation_messages"
+                " WHERE conversation_id = ? ORDER BY seq",
+                (conversation_id,)
+            ).fetchall()
+            messages = [{"role": role, "content": content} for role, content in rows]
+            self._remember(conversation_id, messages)
+            return list(messages)
+
+    def append(self, conversation_id, *messages):
+        """
+        Append messages ({"role": ..., "content": ...}) to a conversation
+        """
+        now = time.time()
+        with self._lock:
+            start = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM conversation_messages"
+                " WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO conversation_messages"
+                " (conversation_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(conversation_id, start + i, m["role"], m["content"], now)
+                 for i, m in enumerate(messages)]
+            )
+            self._conn.execute(
+                "UPDATE conversations SET updated_at = ? WHERE id = ?", (now, conversation_id)
+            )
+            self._conn.commit()
+
+            cached = self._cache.get(conversation_id)
+            if cached is not None:
+                cached.extend({"role": m["role"], "content": m["content"]} for m in messages)
+
+    def delete(self, conversation_id):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM conversation_messages WHERE conversation_id = ?", (conversation_id,)
+            )
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self._conn.commit()
+            self._cache.pop(conversation_id, None)
@@ -0,0 +1,221 @@
+# image_store.py
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Longest side, in pixels, of each thumbnail size
+THUMBNAIL_SIZES = {
+    "small": 96,
+    "medium": 320
+}
+
+# Bytes hashed and written at a time when storing an upload
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Names of content-addressed images: <sha256>.<extension>
+STORED_NAME = re.compile(r"^[0-9a-f]{64}\.(png|jpg|gif)$")
+
+TEMP_PREFIX = ".upload-"
+
+
+class ImageStore:
+    """
+    Content-addressed store for uploaded profile images.
+
+    An upload is hashed while it is copied to disk and kept as
+    <sha256>.<ext>, so the same picture uploaded twice is stored once and a
+    name always refers to the same bytes, which lets clients cache it
+    forever. Thumbnails are made by a small worker pool after the request
+    has returned. Since one file can back several students, images nobody
+    refers to any more are removed by an occasional background sweep rather
+    than when a profile changes.
+    """
+
+    def __init__(self, root, sizes=None, max_workers=2, cleanup_interval=3600, grace_period=3600):
+        self.root = root
+        self.sizes = dict(sizes or THUMBNAIL_SIZES)
+        self.cleanup_interval = cleanup_interval
+        # Unreferenced images younger than this are kept: their student may not be committed yet
+        self.grace_period = grace_period
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._failed = set()
+        self._last_cleanup = time.monotonic()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, root):
+        return cls(
+            root,
+            max_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+            cleanup_interval=int(os.getenv("IMAGE_CLEANUP_INTERVAL", "3600")),
+            grace_period=int(os.getenv("IMAGE_CLEANUP_GRACE", "3600"))
+        )
+
+    @staticmethod
+    def is_stored_name(name):
+        return STORED_NAME.match(name or "") is not None
+
+    def path(self, name, size=None):
+        """Path of a stored image, or of one of its thumbnails"""
+        if size is None:
+            return os.path.join(self.root, name)
+        return os.path.join(self.root, "thumbs", size, self._thumbnail_name(name))
+
+    @staticmethod
+    def _thumbnail_name(name):
+        digest, extension = name.rsplit(".", 1)
+        # JPEG stays JPEG; PNG and GIF thumbnails are PNG to keep transparency
+        return f"{digest}.{'jpg' if extension == 'jpg' else 'png'}"
+
+    def save(self, stream, filename):
+        """
+        Store an uploaded file under its content hash and queue its thumbnails
+        Returns the stored name
+        """
+        extension = filename.rsplit(".", 1)[-1].lower()
+        extension = "jpg" if extension == "jpeg" else extension
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            name = f"{digest.hexdigest()}.{extension}"
+            target = self.path(name)
+            if os.path.exists(target):
+                # Already stored; refresh its age so a pending sweep does not take it
+                os.remove(temp_path)
+                os.utime(target)
+            else:
+                os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.schedule_thumbnails(name)
+        return name
+
+    def schedule_thumbnails(self, name):
+        """Make the missing thumbnails of an image in the worker pool; returns the Future, or None if there is nothing to do"""
+        if all(os.path.exists(self.path(name, size)) for size in self.sizes):
+            return None
+        with self._lock:
+            if name in self._failed:
+                return None
+            future = self._pending.get(name)
+            if future is None:
+                future = self._pending[name] = self._executor.submit(self._make_thumbnails, name)
+                future.add_done_callback(lambda _: self._forget(name))
+            return future
+
+    def _forget(self, name):
+        with self._lock:
+            self._pending.pop(name, None)
+
+    def _make_thumbnails(self, name):
+        try:
+            with Image.open(self.path(name)) as image:
+                # Let JPEG decode at a reduced scale when that still covers the largest thumbnail
+                largest = max(self.sizes.values())
+                image.draft("RGB", (largest, largest))
+                image = ImageOps.exif_transpose(image)
+
+                for size, pixels in self.sizes.items():
+                    target = self.path(name, size)
+                    if os.path.exists(target):
+                        continue
+                    thumbnail = image.copy()
+                    thumbnail.thumbnail((pixels, pixels))
+                    self._write(thumbnail, target)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Not a readable image: the original keeps being served
+            with self._lock:
+                self._failed.add(name)
+
+    @staticmethod
+    def _write(image, target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if target.endswith(".jpg"):
+            image, options = image.convert("RGB"), {"format": "JPEG", "quality": 85, "optimize": True}
+        else:
+            image, options = image.convert("RGBA"), {"format": "PNG", "optimize": True}
+
+        # Write beside the target and rename, so a reader never sees half a file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, **options)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def thumbnail(self, name, size):
+        """
+        Path of a finished thumbnail, or None while it is being made (or if
+        the image cannot be read). Missing thumbnails are queued, so images
+        stored before a restart or a new size catch up on first request.
+        """
+        path = self.path(name, size)
+        if os.path.exists(path):
+            return path
+        self.schedule_thumbnails(name)
+        return None
+
+    def _remove(self, name):
+        for path in [self.path(name)] + [self.path(name, size) for size in self.sizes]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self, referenced):
+        """
+        Remove stored images (and their thumbnails) whose names are not in
+        `referenced` and that are older than the grace period, along with
+        leftovers of interrupted uploads. Only content-addressed names are
+        considered; any other file in the root, such as an upload saved
+        under its own name before the store existed, is left alone.
+        Returns the number of images removed
+        """
+        cutoff = time.time() - self.grace_period
+        removed = 0
+        for entry in os.scandir(self.root):
+            if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                continue
+            if entry.name.startswith(TEMP_PREFIX):
+                os.remove(entry.path)
+            elif self.is_stored_name(entry.name) and entry.name not in referenced:
+                self._remove(entry.name)
+                removed += 1
+        return removed
+
+    def maybe_collect_garbage(self, referenced):
+        """
+        Start a collect_garbage sweep in the background if the last one is
+        older than cleanup_interval. `referenced` is called in the worker and
+        returns the set of names still in use.
+        Returns the Future of the sweep, or None if it is not due
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_cleanup < self.cleanup_interval:
+                return None
+            self._last_cleanup = now
+        return self._executor.submit(lambda: self.collect_garbage(referenced()))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,241 @@
+# job_queue.py
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Columns added after the first release; missing ones are added to older databases
+LEASE_COLUMNS = (("owner", "TEXT"), ("lease_expires_at", "REAL"))
+
+
+class JobQueue:
+    """
+    Local background job runner: jobs are recorded in a SQLite table and run
+    by a pool of worker threads, so callers get a job id immediately and poll
+    for the result. No external broker is needed.
+
+    Several processes may share one database. Each unfinished job is leased
+    to the process that runs it, which renews the lease while the job is
+    queued or running; jobs whose lease has lapsed (their process died) are
+    claimed by another process and run again.
+    """
+
+    def __init__(self, path="ai_jobs.db", max_workers=4, result_ttl=86400, lease_ttl=60, purge_interval=3600):
+        self.path = path
+        self.result_ttl = result_ttl
+        self.lease_ttl = lease_ttl
+        self.purge_interval = purge_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintenance = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-job")
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " expires_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, column_type in LEASE_COLUMNS:
+            if name not in columns:
+                try:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                except sqlite3.OperationalError as e:
+                    # Another process added it first
+                    if "duplicate column" not in str(e):
+                        raise
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_expires_at ON jobs (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_lease ON jobs (status, lease_expires_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.getenv("AI_JOB_DB", "ai_jobs.db"),
+            max_workers=int(os.getenv("AI_JOB_WORKERS", "4")),
+            result_ttl=int(os.getenv("AI_JOB_RESULT_TTL", "86400")),
+            lease_ttl=int(os.getenv("AI_JOB_LEASE_TTL", "60")),
+            purge_interval=int(os.getenv("AI_JOB_PURGE_INTERVAL", "3600"))
+        )
+
+    def register(self, kind, handler):
+        """
+        Register the function that runs jobs of a kind
+        The handler is called with the job payload as keyword arguments and
+        must return a JSON-serializable result
+        """
+        self._handlers[kind] = handler
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def submit(self, kind, payload):
+        """
+        Record a job and schedule it; returns the job id
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job type: {kind}")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, payload, status, created_at, owner, lease_expires_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), QUEUED, now, self.owner, now + self.lease_ttl)
+        )
+        self._executor.submit(self._run, job_id, kind, payload)
+        return job_id
+
+    def _run(self, job_id, kind, payload):
+        now = time.time()
+        claimed = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, lease_expires_at = ?"
+            " WHERE id = ? AND status = ? AND owner = ?",
+            (RUNNING, now, now + self.lease_ttl, job_id, QUEUED, self.owner)
+        ).rowcount
+        if not claimed:
+            # Our lease lapsed and another process took the job over
+            return
+        try:
+            result = self._handlers[kind](**payload)
+        except Exception as e:
+            status, result, error = FAILED, None, str(e)
+        else:
+            # Handlers report their own failures the same way AIService does
+            if isinstance(result, dict) and result.get("status") == "error":
+                status, error = FAILED, result.get("error")
+            else:
+                status, error = SUCCEEDED, None
+
+        finished_at = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?,"
+            " lease_expires_at = NULL WHERE id = ? AND owner = ?",
+            (status, json.dumps(result), error, finished_at, finished_at + self.result_ttl, job_id, self.owner)
+        )
+
+    def get(self, job_id):
+        """
+        Return the job as a dict, or None if it doesn't exist or has expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, result, error, created_at, started_at, finished_at, expires_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job_id, kind, status, result, error, created_at, started_at, finished_at, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+
+        return {
+            "id": job_id,
+            "type": kind,
+            "status": status,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "expires_at": expires_at
+        }
+
+    def purge_expired(self):
+        """
+        Delete finished jobs whose results have expired; returns how many were removed
+        """
+        return self._execute(
+            "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+
+    def recover(self):
+        """
+        Claim and re-schedule unfinished jobs whose lease has lapsed, i.e.
+        whose process stopped before finishing them. Jobs leased by live
+        processes are left alone. Returns the number of jobs claimed
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status IN (?, ?)"
+                " AND (lease_expires_at IS NULL OR lease_expires_at <= ?)",
+                (QUEUED, RUNNING, now)
+            ).fetchall()
+
+        claimed = 0
+        for job_id, kind, payload in rows:
+            if kind not in self._handlers:
+                continue
+            # Only one process wins the claim: the lease must still be lapsed when it is taken
+            if self._execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, owner = ?, lease_expires_at = ?"
+                " WHERE id = ? AND status IN (?, ?) AND (lease_expires_at IS NULL OR lease_expires_at <= ?)",
+                (QUEUED, self.owner, time.time() + self.lease_ttl, job_id, QUEUED, RUNNING, now)
+            ).rowcount:
+                self._executor.submit(self._run, job_id, kind, json.loads(payload))
+                claimed += 1
+        return claimed
+
+    def renew_leases(self):
+        """
+        Extend the lease of every unfinished job this process owns
+        """
+        return self._execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status IN (?, ?)",
+            (time.time() + self.lease_ttl, self.owner, QUEUED, RUNNING)
+        ).rowcount
+
+    def start(self):
+        """
+        Purge expired results, claim abandoned jobs and start the maintenance
+        thread, which renews leases and repeats both while the queue runs
+        """
+        self.purge_expired()
+        self.recover()
+        if self._maintenance is None:
+            self._maintenance = threading.Thread(target=self._maintain, name="ai-job-maintenance", daemon=True)
+            self._maintenance.start()
+
+    def _maintain(self):
+        last_purge = time.monotonic()
+        # Renew well before a lease can lapse
+        while not self._stop.wait(self.lease_ttl / 3):
+            try:
+                self.renew_leases()
+                self.recover()
+                if time.monotonic() - last_purge >= self.purge_interval:
+                    self.purge_expired()
+                    last_purge = time.monotonic()
+            except sqlite3.Error:
+                # Database busy or briefly unavailable; try again on the next tick
+                pass
+
+    def shutdown(self, wait=True):
+        self._stop.set()
+        self._executor.shutdown(wait=wait)
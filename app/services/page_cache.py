@@ -0,0 +1,89 @@
+# page_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+from services.response_cache import MemoryCacheBackend
+
+# A piece of cached output with the validators clients revalidate it by
+Fragment = namedtuple("Fragment", "content etag last_modified")
+
+
+def content_etag(content):
+    """ETag for output with no natural version: a hash of the output itself"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class PageCache:
+    """
+    In-process cache of rendered fragments and serialized records, each kept
+    with its ETag and Last-Modified so a hit can answer a conditional request
+    without touching the database or a template. Code that writes the
+    underlying rows calls invalidate(); entries also expire after ttl
+    seconds, which bounds how stale another worker process's copy can get.
+    """
+
+    def __init__(self, backend=None, ttl=300):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a fragment built from rows read
+        # before a write is not stored after that write dropped the old one
+        self._generation = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from PAGE_CACHE_* environment variables
+        PAGE_CACHE_TTL=0 turns caching off
+        """
+        return cls(
+            backend=MemoryCacheBackend(max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "1024"))),
+            ttl=int(os.getenv("PAGE_CACHE_TTL", "300"))
+        )
+
+    def get_or_build(self, key, build):
+        """
+        Return the Fragment cached under key, or call build() to make one
+        and cache it. Exceptions from build() propagate and nothing is stored.
+        """
+        if self.ttl:
+            fragment = self.backend.get(key)
+            if fragment is not None:
+                with self._lock:
+                    self.hits += 1
+                return fragment
+
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+        fragment = build()
+        if self.ttl:
+            with self._lock:
+                if generation == self._generation:
+                    self.backend.set(key, fragment, time.time() + self.ttl)
+        return fragment
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or every entry when none are given"""
+        with self._lock:
+            self._generation += 1
+            if keys:
+                for key in keys:
+                    self.backend.delete(key)
+            else:
+                self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0
+        }
@@ -0,0 +1,214 @@
+# rate_limiter.py
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _seconds_until_tomorrow():
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class RateLimiter:
+    """
+    Per-user, per-endpoint token buckets plus a daily token budget per user.
+
+    Bucket state is kept in memory as (tokens, last_refill) tuples. Daily
+    usage is kept in memory as well, as [reserved, spent] counters per user
+    and day. A process reserves budget from SQLite in chunks of
+    `reserve_chunk` tokens with one conditional upsert, and spends it locally
+    until it runs out, so the request path only touches disk once per chunk
+    and never while holding the bucket lock. A background thread flushes the
+    spent tokens to SQLite and hands unspent reservations back, so several
+    processes sharing the database enforce a single budget between them.
+    """
+
+    def __init__(self, requests_per_minute=20, burst=10, daily_token_budget=200000,
+                 path="ai_usage.db", flush_interval=30, reserve_chunk=5000):
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.daily_token_budget = daily_token_budget
+        self.flush_interval = flush_interval
+        self.reserve_chunk = reserve_chunk
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+        # (user_id, day) -> [tokens reserved from SQLite, tokens spent] since the last flush
+        self._usage = {}
+
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_usage ("
+            " user_id TEXT NOT NULL,"
+            " day TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " reserved INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (user_id, day))"
+        )
+        # Databases created before reservations existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(token_usage)")}
+        if "reserved" not in columns:
+            self._conn.execute("ALTER TABLE token_usage ADD COLUMN reserved INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="usage-flush", daemon=True)
+        self._flusher.start()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            requests_per_minute=float(os.getenv("AI_RATE_LIMIT_PER_MINUTE", "20")),
+            burst=int(os.getenv("AI_RATE_LIMIT_BURST", "10")),
+            daily_token_budget=int(os.getenv("AI_DAILY_TOKEN_BUDGET", "200000")),
+            path=os.getenv("AI_USAGE_DB", "ai_usage.db"),
+            flush_interval=float(os.getenv("AI_USAGE_FLUSH_INTERVAL", "30")),
+            reserve_chunk=int(os.getenv("AI_USAGE_RESERVE_CHUNK", "5000"))
+        )
+
+    def _reserve(self, user_id, day, needed):
+        """
+        Take budget from SQLite for this process: a whole chunk if the
+        budget has room for it, otherwise exactly `needed` tokens. The check
+        and the increment are one statement, so concurrent processes cannot
+        both reserve the last of a budget.
+        Returns the number of tokens reserved (0 if the budget is exhausted)
+        """
+        with self._db_lock:
+            for amount in dict.fromkeys((max(needed, self.reserve_chunk), needed)):
+                cursor = self._conn.execute(
+                    "INSERT INTO token_usage (user_id, day, tokens, reserved) VALUES (?, ?, 0, ?)"
+                    " ON CONFLICT (user_id, day) DO UPDATE SET reserved = reserved + excluded.reserved"
+                    " WHERE tokens + reserved + excluded.reserved <= ?",
+                    (user_id, day, amount, self.daily_token_budget)
+                )
+                self._conn.commit()
+                if cursor.rowcount > 0:
+                    return amount
+        return 0
+
+    def _spend(self, counters, tokens):
+        """Spend tokens from a local reservation if it covers them; call with the lock held."""
+        reserved, spent = counters
+        if reserved - spent < tokens:
+            return False
+        counters[1] = spent + tokens
+        return True
+
+    def acquire(self, user_id, endpoint, tokens, cost=1):
+        """
+        Try to admit a request that may use up to `tokens` model tokens.
+        `cost` is the number of bucket slots it takes (e.g. the items in a
+        batch). A request costing more than the burst is admitted once the
+        bucket is full and leaves it in debt, so later requests wait for the
+        slots it used.
+        Returns (allowed, retry_after_seconds, reason); admitted requests are
+        charged against the daily budget immediately.
+        """
+        if tokens > self.daily_token_budget:
+            return False, None, "Request is larger than the daily token budget"
+
+        now = time.monotonic()
+        day = _today()
+        key = (user_id, endpoint)
+        with self._lock:
+            available, updated = self._buckets.get(key, (self.burst, now))
+            available = min(self.burst, available + (now - updated) * self.rate)
+            needed = min(cost, self.burst)
+            if available < needed:
+                self._buckets[key] = (available, now)
+                return False, (needed - available) / self.rate, "Rate limit exceeded"
+
+            # Take the slots now; they are handed back if the budget refuses
+            self._buckets[key] = (available - cost, now)
+            counters = self._usage.setdefault((user_id, day), [0, 0])
+            if self._spend(counters, tokens):
+                return True, 0, None
+            shortfall = tokens - (counters[0] - counters[1])
+
+        reserved = self._reserve(user_id, day, shortfall)
+
+        with self._lock:
+            counters = self._usage.setdefault((user_id, day), [0, 0])
+            counters[0] += reserved
+            if self._spend(counters, tokens):
+                return True, 0, None
+            available, updated = self._buckets.get(key, (self.burst, now))
+            self._buckets[key] = (min(self.burst, available + cost), updated)
+        return False, _seconds_until_tomorrow(), "Daily token budget exhausted"
+
+    def usage(self, user_id):
+        """
+        The user's usage for the day. Tokens other processes have reserved
+        but not yet spent count as used until they flush.
+        """
+        day = _today()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT tokens, reserved FROM token_usage WHERE user_id = ? AND day = ?", (user_id, day)
+            ).fetchone()
+        tokens, reserved = row if row else (0, 0)
+        with self._lock:
+            own_reserved, spent = self._usage.get((user_id, day), (0, 0))
+        used = tokens + reserved - own_reserved + spent
+        return {
+            "day": day,
+            "tokens_used": used,
+            "daily_token_budget": self.daily_token_budget,
+            "tokens_remaining": max(self.daily_token_budget - used, 0)
+        }
+
+    def flush(self):
+        """
+        Add the tokens spent since the last flush to SQLite and return the
+        unspent part of this process's reservations to the shared budget.
+        Both are applied as increments, so several processes can share one
+        usage database.
+        """
+        with self._lock:
+            rows = [(spent, reserved, user_id, day)
+                    for (user_id, day), (reserved, spent) in self._usage.items() if reserved]
+            self._usage.clear()
+
+        if rows:
+            with self._db_lock:
+                self._conn.executemany(
+                    "UPDATE token_usage SET tokens = tokens + ?, reserved = MAX(reserved - ?, 0)"
+                    " WHERE user_id = ? AND day = ?",
+                    rows
+                )
+                self._conn.commit()
+
+    def prune(self):
+        """
+        Drop buckets that have been idle long enough to refill completely;
+        such a bucket is the same as no bucket
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key, (available, updated) in list(self._buckets.items()):
+                if self.rate and now - updated >= (self.burst - available) / self.rate:
+                    del self._buckets[key]
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            self.prune()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,210 @@
+# response_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """
+    Normalize a prompt so trivially different spellings share a cache entry
+    (surrounding/repeated whitespace is ignored; letter case is kept, since
+    it can change what the prompt asks for)
+    """
+    return re.sub(r"\s+", " ", prompt or "").strip()
+
+
+def make_cache_key(system_message, prompt, model, max_tokens, temperature):
+    """
+    Build a stable cache key from everything that affects the completion
+    """
+    payload = json.dumps(
+        [system_message, normalize_prompt(prompt), model, max_tokens, temperature],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry expiry
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk LRU cache stored in a single SQLite table, shared between
+    processes that point at the same file
+    """
+
+    def __init__(self, path="ai_response_cache.db", max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_last_access"
+            " ON response_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key, value, expires_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time())
+            )
+            # Evict least recently used entries beyond the size bound
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY last_access DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Size-bounded, TTL-aware response cache in front of a pluggable backend
+    """
+
+    def __init__(self, backend=None, ttl=3600):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from AI_CACHE_* environment variables
+        AI_CACHE_BACKEND options: "memory" (default), "sqlite", "none"
+        """
+        backend_name = os.getenv("AI_CACHE_BACKEND", "memory").lower()
+        if backend_name == "none":
+            return None
+
+        max_entries = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+        ttl = int(os.getenv("AI_CACHE_TTL", "86400"))
+
+        if backend_name == "sqlite":
+            backend = SQLiteCacheBackend(
+                path=os.getenv("AI_CACHE_PATH", "ai_response_cache.db"),
+                max_entries=max_entries
+            )
+        else:
+            backend = MemoryCacheBackend(max_entries=max_entries)
+
+        return cls(backend=backend, ttl=ttl)
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self.backend.set(key, value, expires_at)
+
+    def clear(self):
+        self.backend.clear()
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0
+        }
@@ -0,0 +1,121 @@
+# single_flight.py
+import asyncio
+import hashlib
+import json
+import threading
+
+
+def make_request_key(messages, model, **params):
+    """
+    Build a key identifying an upstream request by its messages, model and parameters
+    """
+    payload = json.dumps([messages, model, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+    The first caller runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)
+            }
+
+
+class _AsyncCall:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of SingleFlight for use on a single event loop.
+    The shared call runs as its own task, so one waiter being cancelled
+    does not cancel the call for the others; it is cancelled once the
+    last waiter has gone.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn):
+        call = self._tasks.get(key)
+        if call is None:
+            call = self._tasks[key] = _AsyncCall(asyncio.ensure_future(coro_fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is waiting for the result any more: stop the upstream call
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        # A newer call may already be registered under the same key
+        if self._tasks.get(key) is call:
+            del self._tasks[key]
+
+    def stats(self):
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks)
+        }
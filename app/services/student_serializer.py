@@ -0,0 +1,125 @@
+# student_serializer.py
+import numpy as np
+import pandas as pd
+from sqlalchemy import Date, DateTime, String, type_coerce
+
+# Rows fetched from the database and encoded at a time when streaming
+DEFAULT_BATCH_SIZE = 5000
+
+# Output formats of Student.to_dict, as NumPy datetime units
+DATE_UNIT = "D"        # '%Y-%m-%d'
+DATETIME_UNIT = "s"    # '%Y-%m-%d %H:%M:%S'
+
+WIDTHS = {DATE_UNIT: 10, DATETIME_UNIT: 19}
+
+
+def column_units(columns):
+    """NumPy datetime unit for each date/datetime column of a select, None for other columns."""
+    units = []
+    for column in columns:
+        if isinstance(column.type, DateTime):
+            units.append(DATETIME_UNIT)
+        elif isinstance(column.type, Date):
+            units.append(DATE_UNIT)
+        else:
+            units.append(None)
+    return units
+
+
+def raw_columns(columns):
+    """
+    Select expressions for `columns` that read date and datetime columns as
+    the driver returns them. SQLite keeps them as ISO text, which SQLAlchemy
+    would otherwise parse into a datetime per value only for it to be
+    formatted back into a string.
+    """
+    return [type_coerce(column, String).label(column.name) if unit else column
+            for column, unit in zip(columns, column_units(columns))]
+
+
+def format_dates(values, unit):
+    """
+    Format a whole column of date or datetime values the way Student.to_dict
+    does, in a few array operations instead of one strftime call per value.
+    Accepts date/datetime objects or ISO strings; None stays None.
+
+    Returns:
+        Object array of strings and None
+    """
+    values = np.asarray(values, dtype=object)
+    if not len(values):
+        return values
+    missing = pd.isna(values)
+    sample = next((value for value in values[~missing]), None)
+
+    if isinstance(sample, str):
+        # ISO text ('2024-01-31 08:00:00.123456'): the wanted format is its prefix
+        text = values.astype(f"U{WIDTHS[unit]}")
+    else:
+        stamps = pd.to_datetime(pd.Series(values)).to_numpy().astype(f"datetime64[{unit}]")
+        text = np.datetime_as_string(stamps, unit=unit)
+        if unit == DATETIME_UNIT:
+            text = np.char.replace(text, "T", " ")
+
+    formatted = text.astype(object)
+    formatted[missing] = None
+    return formatted
+
+
+def serialize_rows(rows, names, units):
+    """
+    Turn a batch of row tuples into dicts keyed by `names`. Date columns are
+    formatted column by column with format_dates. Rows may carry extra
+    trailing columns (for example a sort key); they are left out.
+    """
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    for i, unit in enumerate(units):
+        if unit:
+            columns[i] = format_dates(columns[i], unit).tolist()
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def encode_rows(rows, names, units):
+    """
+    Encode a batch of row tuples as the items of a JSON array of objects
+    (without the surrounding brackets). The batch is handled as a table:
+    date columns are formatted with format_dates and pandas writes the JSON.
+    """
+    frame = pd.DataFrame(rows, columns=names, dtype=object)
+    for name, unit in zip(names, units):
+        if unit:
+            frame[name] = format_dates(frame[name].to_numpy(), unit)
+    return frame.to_json(orient="records", double_precision=15)[1:-1]
+
+
+def iter_partitions(engine, statement, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run a Core select on its own connection and yield its rows as lists of
+    tuples, batch_size rows at a time. The connection is opened when
+    iteration starts, so this can run after the request's session is gone.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(statement)
+        for rows in result.partitions(batch_size):
+            yield rows
+
+
+def iter_json_array(engine, statement, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield the rows of a Core select as a JSON array of objects, one batch at a
+    time, so a response can start before the last row is read. Keys are the
+    selected column names. No ORM objects are built on the way.
+    """
+    columns = list(statement.selected_columns)
+    names = [column.name for column in columns]
+    units = column_units(columns)
+    statement = statement.with_only_columns(*raw_columns(columns))
+
+    yield "["
+    separator = ""
+    for rows in iter_partitions(engine, statement, batch_size):
+        yield separator + encode_rows(rows, names, units)
+        separator = ","
+    yield "]"
@@ -0,0 +1,90 @@
+"""
+Benchmark the AI request path (routes -> service -> cache -> streaming)
+against the local stub provider, with no network access.
+
+    python benchmarks/bench_ai_routes.py --requests 200 --distinct 20 --concurrency 32
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def report(label, timings):
+    print(f"{label:<22} n={len(timings):<5} "
+          f"p50={percentile(timings, 50) * 1000:8.1f}ms "
+          f"p95={percentile(timings, 95) * 1000:8.1f}ms "
+          f"mean={statistics.mean(timings) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=20, help="number of distinct prompts")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub first-token latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # Configure the stub before the service module reads its settings
+    os.environ["AI_PROVIDER"] = "stub"
+    os.environ["AI_STUB_LATENCY"] = str(args.latency)
+    os.environ["AI_STUB_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ["AI_STUB_ERROR_RATE"] = str(args.error_rate)
+    os.environ.setdefault("AI_CACHE_BACKEND", "memory")
+    os.environ.setdefault("AI_RATE_LIMIT_ENABLED", "false")
+
+    from flask import Flask
+    from routes.ai_routes import ai_bp
+    from services.ai_service import AIService
+
+    app = Flask(__name__)
+    app.register_blueprint(ai_bp)
+    client = app.test_client()
+
+    prompts = [f"Topic number {i % args.distinct}" for i in range(args.requests)]
+
+    def generate(prompt):
+        start = time.perf_counter()
+        response = client.post("/generate", json={"prompt": prompt, "content_type": "quiz"})
+        return time.perf_counter() - start, response.status_code
+
+    def chat_stream(prompt):
+        start = time.perf_counter()
+        response = client.post("/chat/stream", json={"prompt": prompt}, buffered=False)
+        chunks = iter(response.response)
+        next(chunks)
+        first_byte = time.perf_counter() - start
+        for _ in chunks:
+            pass
+        response.close()
+        return first_byte, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(generate, prompts))
+        elapsed = time.perf_counter() - started
+        report("/generate", [t for t, _ in results])
+        errors = sum(1 for _, status in results if status != 200)
+        print(f"{'':<22} throughput={len(results) / elapsed:.1f} req/s errors={errors}")
+        print(f"{'':<22} cache={AIService.cache_stats()}")
+        print(f"{'':<22} coalescing={AIService.coalescing_stats()}")
+
+        streams = list(pool.map(chat_stream, prompts[:min(len(prompts), 50)]))
+        report("/chat/stream TTFB", [ttfb for ttfb, _ in streams])
+        report("/chat/stream total", [total for _, total in streams])
+
+
+if __name__ == "__main__":
+    main()
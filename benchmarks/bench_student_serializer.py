@@ -0,0 +1,124 @@
+"""
+Benchmark serializing the student roster: ORM objects through Student.to_dict
+against the columnar path in services/student_serializer.py.
+
+    python benchmarks/bench_student_serializer.py --rows 50000 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+
+def load_student_model():
+    """
+    Import app/models/student.py with a fresh `db`. models/__init__.py still
+    declares an older Student on the same table, so the module is loaded
+    into a bare `models` package, with a minimal Assessment to satisfy the
+    Student.assessments relationship.
+    """
+    from flask_sqlalchemy import SQLAlchemy
+
+    package = types.ModuleType("models")
+    package.__path__ = [os.path.join(ROOT, "app", "models")]
+    package.db = db = SQLAlchemy()
+    sys.modules["models"] = package
+
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+
+    class Assessment(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        student_id = db.Column(db.Integer, db.ForeignKey("student.id"))
+
+    from models.student import Student
+    # The declarative registry only keeps weak references
+    package.User, package.Assessment, package.Student = User, Assessment, Student
+    return db, Student
+
+
+def populate(db, Student, rows):
+    start = datetime(2023, 8, 1, 7, 30)
+    db.session.execute(Student.__table__.insert(), [
+        {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"student{i}@school.example",
+            "date_of_birth": date(2008, 1, 1) + timedelta(days=i % 3650),
+            "grade_level": i % 12 + 1,
+            "teacher_id": i % 40 + 1,
+            "created_at": start + timedelta(seconds=i * 17, microseconds=i % 1000),
+            "updated_at": start + timedelta(days=1, seconds=i * 13)
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db, Student = load_student_model()
+
+    from flask import Flask
+    from sqlalchemy import select
+    from routes.student_routes import STUDENT_FIELDS, student_bp
+    from services.student_serializer import iter_json_array
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_students_"), "students.db")
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    db.init_app(app)
+    app.register_blueprint(student_bp)
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        populate(db, Student, args.rows)
+
+        def per_object():
+            # What GET /api/students did: hydrate every row, to_dict each one, then jsonify
+            db.session.remove()
+            return app.json.dumps([student.to_dict() for student in Student.query.order_by(Student.id).all()])
+
+        def columnar():
+            statement = select(*[Student.__table__.c[name] for name in STUDENT_FIELDS]).order_by(Student.id)
+            return "".join(iter_json_array(db.engine, statement))
+
+        orm_time, orm_body = timed(per_object, args.repeat)
+        bulk_time, bulk_body = timed(columnar, args.repeat)
+        assert json.loads(orm_body) == json.loads(bulk_body), "columnar output differs from Student.to_dict"
+
+    http_time, response = timed(lambda: client.get("/api/students/export").data, args.repeat)
+    assert len(json.loads(response)) == args.rows
+
+    print(f"{args.rows} students, best of {args.repeat}\n")
+    print(f"{'path':<28} {'seconds':>8} {'rows/s':>10} {'speedup':>8}")
+    for label, elapsed in (("ORM + to_dict", orm_time),
+                           ("Core + columnar", bulk_time),
+                           ("GET /api/students/export", http_time)):
+        print(f"{label:<28} {elapsed:>8.3f} {args.rows / elapsed:>10,.0f} {orm_time / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark PerformanceTracker storage for a cohort of students: memory per
+student-year and the cost of numeric operations with float32 columns,
+float64 columns and the old DataFrame of date strings.
+
+    python benchmarks/bench_tracker_storage.py --students 200 --years 3 --metrics 12
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+
+def make_frame(days, metrics, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(70, 12, size=(days, metrics)).round(1),
+                         columns=[f"metric_{i}" for i in range(metrics)])
+    # Not every metric is recorded every day
+    frame = frame.mask(rng.random(frame.shape) < 0.2)
+    frame.insert(0, "date", pd.date_range("2020-01-01", periods=days).strftime("%Y-%m-%d"))
+    return frame
+
+
+def buffer_bytes(tracker):
+    n = len(tracker)
+    return tracker._dates[:n].nbytes + sum(values[:n].nbytes for values in tracker._columns.values())
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--metrics", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_tracker_"))
+    from routes.analytics_routes import PerformanceTracker
+
+    days = 365 * args.years
+    student_years = args.students * args.years
+    frames = [make_frame(days, args.metrics, seed) for seed in range(args.students)]
+    metrics = [c for c in frames[0].columns if c != "date"]
+    periods = [(f"{year}-{month:02d}-01", f"{year}-{month:02d}-28")
+               for year in range(2020, 2020 + args.years) for month in range(1, 13)]
+
+    print(f"{args.students} students x {days} days x {args.metrics} metrics\n")
+    print(f"{'storage':<9} {'bytes/student-year':>19} {'load (ms)':>10} {'means (ms)':>11} "
+          f"{'scan (ms)':>10} {'stats (ms)':>11} {'periods (ms)':>13}")
+
+    # The representation before the NumPy buffers: a DataFrame of date strings and float64 metrics
+    legacy_bytes = sum(frame.memory_usage(deep=True).sum() for frame in frames)
+    means = timed(lambda: [frame[metrics].mean() for frame in frames], args.repeat)
+    column = pd.concat([frame[metrics] for frame in frames]).to_numpy()
+    scan = timed(lambda: (np.nanmean(column, axis=0), np.nanstd(column, axis=0)), args.repeat)
+    print(f"{'legacy':<9} {legacy_bytes / student_years:>19,.0f} {'':>10} {means * 1e3:>11.1f} {scan * 1e3:>10.1f}")
+
+    for dtype in (np.float64, np.float32):
+        start = time.perf_counter()
+        trackers = []
+        for i, frame in enumerate(frames):
+            tracker = PerformanceTracker(f"bench {i}", dtype=dtype)
+            tracker.record_many(frame)
+            trackers.append(tracker)
+        load = time.perf_counter() - start
+
+        memory = sum(buffer_bytes(tracker) for tracker in trackers)
+        means = timed(lambda: [np.nanmean(values[:len(tracker)])
+                               for tracker in trackers for values in tracker._columns.values()], args.repeat)
+        # One pass over every value of the cohort, as cohort analytics does
+        column = np.column_stack([np.concatenate([tracker._columns[metric][:len(tracker)] for tracker in trackers])
+                                  for metric in metrics])
+        scan = timed(lambda: (np.nanmean(column, axis=0), np.nanstd(column, axis=0)), args.repeat)
+        stats = timed(lambda: [tracker.get_stats(metric, exact=True)
+                               for tracker in trackers for metric in metrics], 1)
+        windows = timed(lambda: [tracker.compare_many_periods(metrics[0], periods) for tracker in trackers], 1)
+        print(f"{np.dtype(dtype).name:<9} {memory / student_years:>19,.0f} {load * 1e3:>10.1f} "
+              f"{means * 1e3:>11.1f} {scan * 1e3:>10.1f} {stats * 1e3:>11.1f} {windows * 1e3:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
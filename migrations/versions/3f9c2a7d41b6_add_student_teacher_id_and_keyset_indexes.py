@@ -0,0 +1,51 @@
+"""add student teacher_id and keyset pagination indexes
+
+Revision ID: 3f9c2a7d41b6
+Revises: 
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = (
+    ('ix_student_grade_level_id', ['grade_level', 'id']),
+    ('ix_student_teacher_id_id', ['teacher_id', 'id']),
+    ('ix_student_created_at_id', ['created_at', 'id']),
+)
+
+
+def upgrade():
+    # This is the first revision, so databases built with db.create_all()
+    # may already have some of these; only add what is missing
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('student')}
+    indexes = {index['name'] for index in inspector.get_indexes('student')}
+
+    if 'teacher_id' not in columns:
+        with op.batch_alter_table('student') as batch_op:
+            batch_op.add_column(sa.Column('teacher_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_student_teacher_id_user', 'user', ['teacher_id'], ['id'])
+
+    for name, index_columns in KEYSET_INDEXES:
+        if name not in indexes:
+            op.create_index(name, 'student', index_columns)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index['name'] for index in inspector.get_indexes('student')}
+    for name, _ in reversed(KEYSET_INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name='student')
+
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.drop_column('teacher_id')
@@ -33,6 +33,14 @@ class Student(db.Model):
     profile_image = db.Column(db.String(200), nullable=True, default='default.jpg')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    
+    # Keyset pagination: listings are walked in (id) or (created_at, id) order,
+    # optionally filtered by grade or teacher
+    __table_args__ = (
+        db.Index('ix_student_grade_level_id', 'grade_level', 'id'),
+        db.Index('ix_student_teacher_id_id', 'teacher_id', 'id'),
+        db.Index('ix_student_created_at_id', 'created_at', 'id'),
+    )
 
 # Assessment Model
 class Assessment(db.Model):
@@ -0,0 +1,12 @@
+# tests/conftest.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app's modules import each other from app/ (services.*, routes.*), and
+# the student routes use the top-level models module, as when run from the root
+for path in (os.path.join(ROOT, 'app'), ROOT):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from routes.analytics_routes import PerformanceTracker
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # Trackers save under ./performance_data_<name>
+    monkeypatch.chdir(tmp_path)
+
+
+def journaled(name="math", compact_every=1000):
+    tracker = PerformanceTracker.open_journal(name, metrics=["score"], compact_every=compact_every)
+    return tracker, tracker._journal_dir
+
+
+def frame(tracker):
+    return tracker.data.reset_index(drop=True)
+
+
+def test_journal_is_replayed_on_load():
+    tracker, dirpath = journaled()
+    tracker.record_data("2024-01-02", {"score": 80})
+    tracker.record_data("2024-01-01", {"score": 70})
+    tracker.record_data("2024-01-02", {"score": 85, "effort": 3})
+    tracker.set_goal("score", 90)
+    tracker.close_journal()
+
+    loaded = PerformanceTracker.load_data(dirpath)
+    pd.testing.assert_frame_equal(frame(loaded), frame(tracker))
+    assert loaded.metrics == ["score", "effort"]
+    assert loaded.goals["score"]["target"] == 90
+    assert loaded.version == PerformanceTracker.saved_version(dirpath)
+
+
+def test_compaction_folds_the_journal_into_a_snapshot():
+    tracker, dirpath = journaled(compact_every=3)
+    for day in range(1, 6):
+        tracker.record_data(f"2024-01-0{day}", {"score": day * 10})
+    tracker.close_journal()
+
+    with open(os.path.join(dirpath, "journal.log")) as f:
+        assert len(f.readlines()) == 2
+    loaded = PerformanceTracker.load_data(dirpath)
+    assert list(loaded.data["score"]) == [10, 20, 30, 40, 50]
+
+
+def test_torn_final_journal_line_is_ignored():
+    tracker, dirpath = journaled()
+    tracker.record_data("2024-01-01", {"score": 70})
+    tracker.close_journal()
+    with open(os.path.join(dirpath, "journal.log"), "a") as f:
+        f.write('{"op":"record","date":"2024-01-0')
+
+    loaded = PerformanceTracker.load_data(dirpath)
+    assert list(loaded.data["score"]) == [70]
+
+
+def test_version_changes_with_the_journal_and_is_stable_across_loads():
+    tracker, dirpath = journaled()
+    tracker.record_data("2024-01-01", {"score": 70})
+    first = PerformanceTracker.saved_version(dirpath)
+    assert PerformanceTracker.load_data(dirpath).version == first
+
+    tracker.record_data("2024-01-02", {"score": 75})
+    assert PerformanceTracker.saved_version(dirpath) != first
+    tracker.close_journal()
+
+
+def test_read_metric_without_journal_tail_matches_load():
+    tracker = PerformanceTracker("math", metrics=["score", "effort"])
+    tracker.record_data("2024-01-01", {"score": 89.7, "effort": 2})
+    tracker.record_data("2024-01-03", {"score": 91.2})
+    dirpath = tracker.save_data()
+
+    series = PerformanceTracker.read_metric(dirpath, "score")
+    assert list(series.index.strftime("%Y-%m-%d")) == ["2024-01-01", "2024-01-03"]
+    np.testing.assert_array_equal(series.to_numpy(), tracker.data["score"].to_numpy())
+
+
+def test_read_metric_applies_the_journal_tail():
+    tracker, dirpath = journaled()
+    tracker.record_data("2024-01-01", {"score": 70})
+    tracker.record_data("2024-01-03", {"score": 80})
+    tracker.compact()
+    # Journal tail: a new date, a changed value, a cleared value and another metric
+    tracker.record_data("2024-02-01", {"score": 95})
+    tracker.record_data("2024-01-03", {"score": 82})
+    tracker.record_data("2024-01-01", {"score": None})
+    tracker.record_data("2024-01-02", {"effort": 4})
+    tracker.close_journal()
+
+    series = PerformanceTracker.read_metric(dirpath, "score")
+    expected = PerformanceTracker.load_data(dirpath).data.set_index("date")["score"]
+    assert list(series.index.strftime("%Y-%m-%d")) == list(expected.index)
+    np.testing.assert_array_equal(series.to_numpy(), expected.to_numpy())
+
+
+def test_read_metric_follows_metric_removal():
+    tracker, dirpath = journaled()
+    tracker.record_data("2024-01-01", {"score": 70, "effort": 2})
+    tracker.compact()
+    tracker.remove_metric("effort")
+    tracker.close_journal()
+
+    with pytest.raises(KeyError):
+        PerformanceTracker.read_metric(dirpath, "effort")
+    with pytest.raises(KeyError):
+        PerformanceTracker.read_metric(dirpath, "missing")
+
+
+def test_json_save_round_trips_float32_values():
+    tracker = PerformanceTracker("math", metrics=["score"])
+    tracker.record_data("2024-01-01", {"score": 89.7})
+    filepath = tracker.save_data("math.json")
+
+    with open(filepath) as f:
+        assert json.load(f)["data"][0]["score"] == 89.7
@@ -0,0 +1,59 @@
+import time
+
+from services.response_cache import ResponseCache, SQLiteCacheBackend, make_cache_key
+
+
+def sqlite_cache(tmp_path, max_entries=10, ttl=3600):
+    return ResponseCache(SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=max_entries), ttl=ttl)
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = sqlite_cache(tmp_path)
+    assert cache.get("k") is None
+    cache.set("k", {"content": "hello"})
+    assert cache.get("k") == {"content": "hello"}
+
+    stats = cache.stats()
+    assert (stats["backend"], stats["entries"], stats["hits"], stats["misses"]) == ("SQLiteCacheBackend", 1, 1, 1)
+
+
+def test_entries_are_shared_through_the_file(tmp_path):
+    sqlite_cache(tmp_path).set("k", "value")
+    assert sqlite_cache(tmp_path).get("k") == "value"
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    backend.set("old", "value", expires_at=time.time() - 1)
+    assert backend.get("old") is None
+    assert len(backend) == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = sqlite_cache(tmp_path, max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    time.sleep(0.01)
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_clear(tmp_path):
+    cache = sqlite_cache(tmp_path)
+    cache.set("k", "v")
+    cache.get("k")
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_key_ignores_whitespace_but_not_case():
+    key = make_cache_key("system", "  Explain   photosynthesis ", "model", 100, 0.7)
+    assert key == make_cache_key("system", "Explain photosynthesis", "model", 100, 0.7)
+    assert key != make_cache_key("system", "explain photosynthesis", "model", 100, 0.7)
+    assert key != make_cache_key("system", "Explain photosynthesis", "model", 200, 0.7)
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_error_is_shared_and_key_is_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "recovered") == "recovered"
+
+
+def test_async_calls_share_one_execution():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_async_call_survives_one_waiter_cancelling():
+    flight = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_async_call_is_cancelled_when_every_waiter_leaves():
+    flight = AsyncSingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == [True]
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,31 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+
+from routes.student_routes import decode_cursor, encode_cursor
+
+Row = namedtuple("Row", "id created_at")
+
+
+def test_id_cursor_round_trips():
+    cursor = encode_cursor("id", Row(42, datetime(2024, 1, 1)))
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "id") == (42, 42)
+
+
+def test_created_at_cursor_round_trips():
+    created = datetime(2024, 3, 5, 14, 30, 15, 123456)
+    assert decode_cursor(encode_cursor("created_at", Row(7, created)), "created_at") == (created, 7)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor("id", Row(42, datetime(2024, 1, 1)))
+    with pytest.raises(ValueError, match="sort=id"):
+        decode_cursor(cursor, "created_at")
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm90IGpzb24", "WyJpZCIsMV0"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "id")
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, Student
+from routes.student_import import import_records
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'students.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def student(email, **fields):
+    return {'first_name': 'Ada', 'last_name': 'Lovelace', 'email': email, **fields}
+
+
+def rows(*records):
+    return list(enumerate(records, 1))
+
+
+def emails():
+    return sorted(s.email for s in Student.query.all())
+
+
+def test_imports_in_chunks_and_reports_invalid_rows(app):
+    report = import_records(rows(
+        student('a@x.org', grade_level='5'),
+        student('b@x.org', date_of_birth='2012-13-01'),
+        student('c@x.org'),
+        student('a@x.org'),
+        {'first_name': 'No', 'email': 'nobody'},
+        student('d@x.org'),
+    ), chunk_size=2)
+
+    assert (report['processed'], report['created'], report['failed']) == (6, 3, 3)
+    assert [error['row'] for error in report['errors']] == [2, 4, 5]
+    assert report['errors'][1]['errors'] == ["email already appears on row 1"]
+    assert emails() == ['a@x.org', 'c@x.org', 'd@x.org']
+    assert Student.query.filter_by(email='a@x.org').one().grade_level == 5
+
+
+def test_insert_rejects_existing_email_and_upsert_updates_it(app):
+    import_records(rows(student('a@x.org', grade_level=3)))
+
+    report = import_records(rows(student('a@x.org', first_name='Ann'), student('b@x.org')))
+    assert (report['created'], report['failed']) == (1, 1)
+    assert report['errors'][0]['errors'] == ["Student with this email already exists"]
+
+    report = import_records(rows(student('a@x.org', first_name='Ann')), mode='upsert')
+    assert (report['created'], report['updated']) == (0, 1)
+    updated = Student.query.filter_by(email='a@x.org').one()
+    assert (updated.first_name, updated.grade_level) == ('Ann', 3)
+
+
+def test_dry_run_writes_nothing(app):
+    report = import_records(rows(student('a@x.org')), dry_run=True)
+    assert report['created'] == 1
+    assert emails() == []
+
+
+def test_conflict_after_lookup_falls_back_to_row_by_row(app, tmp_path):
+    # Another writer takes b@x.org between the chunk's email lookup and its insert
+    path = str(tmp_path / 'students.db')
+    written = []
+
+    def other_writer(conn, cursor, statement, parameters, context, executemany):
+        if not written and statement.lstrip().upper().startswith('SELECT') and 'student.email IN' in statement:
+            written.append(True)
+            with sqlite3.connect(path) as other:
+                other.execute("INSERT INTO student (first_name, last_name, email) VALUES ('B', 'C', 'b@x.org')")
+
+    event.listen(db.engine, 'after_cursor_execute', other_writer)
+    try:
+        report = import_records(rows(student('a@x.org'), student('b@x.org'), student('c@x.org')))
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', other_writer)
+
+    assert (report['created'], report['failed']) == (2, 1)
+    assert report['errors'][0]['row'] == 2
+    assert report['errors'][0]['errors'][0].startswith("Rejected by the database")
+    assert emails() == ['a@x.org', 'b@x.org', 'c@x.org']
+    assert Student.query.filter_by(email='b@x.org').one().first_name == 'B'